@@ -1,3 +1,6 @@
+import math
+import os
+from typing import Any, Dict
 import streamlit as st
 import pandas as pd
 from dotenv import load_dotenv
@@ -5,7 +8,33 @@ from dotenv import load_dotenv
 # Load environment variables from .env file BEFORE importing the graph
 load_dotenv()
 
-from src.graph import app as agent_app
+from src.batch import Sender
+from src.config import Config
+from src.jobs import JobStatus, get_job_manager
+from src.metrics import metrics
+from src.resources import warm_up, warm_up_done
+from src.streams import count_rows
+
+# Models, vector store and graphs load in the background while the page renders.
+# Resources live at module level, so later reruns find them already built.
+warm_up()
+
+# Results table page size; the full results are always in the download
+PAGE_SIZE = 50
+POLL_SECONDS = 2  # how often a running campaign's panel refreshes
+FINISHED_STATES = {"done", "failed", "cancelled"}
+
+def to_result_entry(row: Dict[str, Any]) -> Dict[str, str]:
+    """Turns a result-sink row into one row of the results table."""
+    is_qual = bool(row["is_qualified"])
+    reason = f"Error: {row['error']}" if row["error"] else (row["qualification_reason"] or 'N/A')
+    return {
+        "Name": str(row["lead_name"]),
+        "Company": str(row["company"]),
+        "Qualified": "✅ Yes" if is_qual else "🚫 No",
+        "Reason": str(reason),
+        "Draft Email": str(row["draft_email"])
+    }
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -81,6 +110,10 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+def pick_job() -> None:
+    st.session_state["job_id"] = st.session_state["picked_job"]
+    st.query_params["job"] = st.session_state["picked_job"]
+
 # --- SIDEBAR CONFIGURATION ---
 with st.sidebar:
     st.header("🎯 Campaign Settings")
@@ -90,17 +123,119 @@ with st.sidebar:
         sender_company = st.text_input("Company", "Acme Corp")
         sender_product = st.text_area("Value Proposition", "We help companies scale their sales using AI agents.")
     
+    with st.expander("⚡ Performance"):
+        concurrency = st.slider("Parallel Leads", 1, 32, Config.BATCH_CONCURRENCY)
+        st.caption("✅ Models loaded" if warm_up_done() else "⏳ Loading models in the background...")
+    
+    # Campaigns run in the background and outlive reruns; pick any of them
+    manager = get_job_manager()
+    past_jobs = manager.jobs()
+    if past_jobs:
+        with st.expander("🗂️ Campaigns"):
+            labels = {j["job_id"]: f"{j['job_id']} · {j['state']} · {j['completed']}/{j['total']}" for j in past_jobs}
+            st.radio("Show campaign", list(labels), format_func=lambda job: labels[job], index=None,
+                     key="picked_job", on_change=pick_job)
+    
     st.markdown("---")
     uploaded_file = st.file_uploader("📂 Upload Leads (CSV)", type=["csv"], help="Must contain 'name' and 'company' columns.")
 
+# --- CAMPAIGN PANEL ---
+def render_results(job_id: str, status: JobStatus) -> None:
+    """Progress, counts and one page of results, read from the job's files."""
+    finished = status["state"] in FINISHED_STATES
+    done_count = status["completed"]
+    st.progress(min(done_count / max(status["total"], 1), 1.0))
+    if status["state"] == "queued":
+        st.markdown("**⏳ Queued behind other campaigns...**")
+    elif not finished:
+        st.markdown(f"**🔄 Processed ({done_count}/{status['total']}):** `{status['last_lead']}`")
+    elif status["state"] == "done":
+        st.markdown("### ✅ Processing Complete!")
+    elif status["state"] == "cancelled":
+        st.warning(f"Campaign cancelled after {done_count} leads.")
+    else:
+        st.error(f"Campaign failed: {status['error']}")
+    
+    # Summary Metrics
+    qualified_count = status["qualified"]
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Qualified Leads", qualified_count, delta=f"{qualified_count/max(done_count, 1):.1%}")
+    m2.metric("Disqualified", done_count - qualified_count - status["failed"])
+    m3.metric("Errors", status["failed"])
+    
+    # Results table, one page at a time (rows appear in input order)
+    pages = max(1, math.ceil(done_count / PAGE_SIZE))
+    page = int(st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"page_{job_id}"))
+    rows = manager.read_results(job_id, (page - 1) * PAGE_SIZE, PAGE_SIZE)
+    if not rows.empty:
+        rows["is_qualified"] = rows["is_qualified"] == "True"
+        st.dataframe(pd.DataFrame([to_result_entry(r) for r in rows.to_dict("records")]), use_container_width=True)
+
+@st.fragment(run_every=POLL_SECONDS)
+def watch_job(job_id: str) -> None:
+    """Polls a running campaign; only this fragment reruns, not the whole page."""
+    status = manager.status(job_id)
+    if status is None or status["state"] in FINISHED_STATES:
+        st.rerun()  # Full rerun renders the finished view, which stops polling
+        return
+    render_results(job_id, status)
+    if st.button("⏹️ Cancel Campaign", key=f"cancel_{job_id}"):
+        manager.cancel(job_id)
+
+def show_job(job_id: str) -> None:
+    status = manager.status(job_id)
+    st.markdown("---")
+    st.header("📊 Campaign Results")
+    if status is None:
+        st.warning("This campaign is no longer available (the server was restarted).")
+        return
+    st.caption(f"Campaign `{job_id}` · {status['total']} leads")
+    if status["state"] not in FINISHED_STATES:
+        watch_job(job_id)
+        return
+    
+    render_results(job_id, status)
+    
+    # Performance: per-node / per-provider latency, tokens and cache hits (whole server process)
+    report = metrics.report()
+    with st.expander("⏱️ Performance Metrics"):
+        if report["latencies"]:
+            latency_df = pd.DataFrame(report["latencies"]).fillna("")
+            st.dataframe(latency_df.round(3), use_container_width=True)
+        if report["counters"]:
+            st.dataframe(pd.DataFrame(report["counters"]).fillna(""), use_container_width=True)
+        st.download_button("📥 Download Metrics (Prometheus)", metrics.render_prometheus(),
+                           file_name="ai_agent_metrics.prom", mime="text/plain")
+    
+    # Download Button
+    if not os.path.exists(status["results_path"]):
+        return
+    with open(status["results_path"], "rb") as f:
+        csv = f.read()
+    st.download_button(
+        label="📥 Download Results CSV",
+        data=csv,
+        file_name="ai_agent_results.csv",
+        mime="text/csv",
+        type="primary",
+        use_container_width=True
+    )
+
 # --- MAIN APP LOGIC ---
+# Reattach to the campaign after a rerun or a browser refresh
+job_id = st.session_state.get("job_id") or st.query_params.get("job")
+
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
+    # Only the header is parsed here; leads are streamed in chunks by the worker
+    columns = list(pd.read_csv(uploaded_file, nrows=0).columns)
+    uploaded_file.seek(0)
+    total_leads = count_rows(uploaded_file)
+    uploaded_file.seek(0)
     
     # --- METRICS DASHBOARD (TOP) ---
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Leads", len(df))
-    col2.metric("Est. Time", f"~{len(df) * 30 // 60} mins")
+    col1.metric("Total Leads", total_leads)
+    col2.metric("Est. Time", f"~{total_leads * 30 // 60 // concurrency} mins")
     col3.metric("Status", "Ready to Start")
     
     st.markdown("---")
@@ -108,107 +243,24 @@ if uploaded_file:
     # --- COLUMN MAPPING ---
     c1, c2 = st.columns(2)
     with c1:
-        name_col = st.selectbox("Select 'Name' Column", df.columns, index=0)
+        name_col = st.selectbox("Select 'Name' Column", columns, index=0)
     with c2:
-        default_company_idx = 1 if len(df.columns) > 1 else 0
-        company_col = st.selectbox("Select 'Company' Column", df.columns, index=default_company_idx)
+        default_company_idx = 1 if len(columns) > 1 else 0
+        company_col = st.selectbox("Select 'Company' Column", columns, index=default_company_idx)
     
     # --- ACTION BUTTON ---
     if st.button("🚀 Launch AI Agents", use_container_width=True):
-        st.write("---")
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        results = []
-        
-        # Create a container for live results
-        results_container = st.container()
-        
-        for i, (index, row) in enumerate(df.iterrows()):
-            lead_name = str(row[name_col])
-            company = str(row[company_col])
-            
-            # Update status
-            status_text.markdown(f"**🔄 Processing ({i+1}/{len(df)}):** `{lead_name} @ {company}`")
-            
-            # --- AGENT EXECUTION ---
-            initial_state = {
-                "sender_name": sender_name,
-                "sender_company": sender_company,
-                "sender_product": sender_product,
-                "lead_name": lead_name,
-                "company": company,
-                "research_snippets": [],
-                "research_summary": "",
-                "is_qualified": False,
-                "qualification_reason": "",
-                "draft_email": "",
-                "critique_feedback": None,
-                "is_perfect": False,
-                "iteration_count": 0
-            }
-            
-            try:
-                output = agent_app.invoke(initial_state) # type: ignore
-                is_qual = output.get('is_qualified', False)
-                reason = output.get('qualification_reason', 'N/A')
-                draft = output.get('draft_email', '')
-            except Exception as e:
-                is_qual = False
-                reason = f"Error: {str(e)}"
-                draft = ""
-            
-            # --- SAVE RESULT ---
-            result_entry = {
-                "Name": lead_name,
-                "Company": company,
-                "Qualified": "✅ Yes" if is_qual else "🚫 No",
-                "Reason": reason,
-                "Draft Email": draft
-            }
-            results.append(result_entry)
-            
-            # --- LIVE DISPLAY ---
-            with results_container:
-                with st.chat_message("assistant" if is_qual else "user", avatar="✅" if is_qual else "🛑"):
-                    st.markdown(f"**{lead_name}** - {result_entry['Qualified']}")
-                    if is_qual:
-                        with st.expander("📧 View Draft Email"):
-                            st.text(draft)
-                    else:
-                        st.caption(f"Reason: {reason}")
-            
-            # Update Progress
-            progress_bar.progress((i + 1) / len(df))
-        
-        status_text.markdown("### ✅ Processing Complete!")
-        
-        # --- RESULTS & DOWNLOAD ---
-        final_df = pd.DataFrame(results)
-        
-        st.markdown("---")
-        st.header("📊 Campaign Results")
-        
-        # Summary Metrics
-        qualified_count = len(final_df[final_df["Qualified"] == "✅ Yes"])
-        m1, m2 = st.columns(2)
-        m1.metric("Qualified Leads", qualified_count, delta=f"{qualified_count/len(df):.1%}")
-        m2.metric("Disqualified", len(df) - qualified_count)
-        
-        # Dataframe
-        st.dataframe(final_df, use_container_width=True)
-        
-        # Download Button
-        csv = final_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Download Results CSV",
-            data=csv,
-            file_name="ai_agent_results.csv",
-            mime="text/csv",
-            type="primary",
-            use_container_width=True
-        )
-
-else:
+        sender: Sender = {
+            "sender_name": sender_name,
+            "sender_company": sender_company,
+            "sender_product": sender_product,
+        }
+        # The campaign runs on the job manager's workers, not in this script run
+        job_id = manager.submit(uploaded_file, name_col, company_col, sender, concurrency, total_leads)
+        st.session_state["job_id"] = job_id
+        st.query_params["job"] = job_id
+
+elif not job_id:
     # Empty State
     st.info("👆 Please upload a CSV file to begin.")
     
@@ -225,4 +277,7 @@ else:
         Elon Musk,Tesla
         Jensen Huang,Nvidia
         ```
-        """)
\ No newline at end of file
+        """)
+
+if job_id:
+    show_job(job_id)
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import re
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.case_index import CaseStudyIndex
+from src.metrics import metrics
+from src.ratelimit import estimate_tokens, get_scheduler
+
+from .profiles import LatencyProfile, calls, company_kind, company_text, stable_fraction
+
+class FakeAPIError(Exception):
+    """Transient provider error; status_code makes the scheduler retry it."""
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"fake provider error {status_code}")
+        self.status_code = status_code
+
+def _attempt(profile: LatencyProfile) -> float:
+    delay, fail = profile.sample()
+    if fail:
+        raise FakeAPIError(429 if delay < profile.base + profile.jitter / 2 else 503)
+    return delay
+
+# --- CHAT MODEL ---
+_FILTER = re.compile(r"Should we reach out to (.+?) regarding")
+_BATCH_FILTER = re.compile(r"^\[(\d+)\] Company: (.+)$", re.MULTILINE)
+_WRITER = re.compile(
+    r"Senior Sales Executive at (.+?)\. Your name is (.+?)\. "
+    r"You are writing a cold email to (.+?) at (.+?) to sell (.+?)\. "
+)
+
+def _email(sender_company: str, sender_name: str, lead: str, company: str, product: str, words: int) -> str:
+    body = [
+        f"Hi {lead},",
+        f"I saw the recent news about {company}.",
+        f"Teams like yours use {product} to spend less time on research.",
+        "It finds the right accounts and drafts the first email for you.",
+        "One customer cut prep time in half within a month.",
+    ]
+    while len(" ".join(body).split()) < words:
+        body.append("Happy to share how the rollout looked for a team of your size.")
+    body.append(f"Would a short call next week be useful?\n\n{sender_name}, {sender_company}")
+    return "\n".join(body)
+
+class FakeChatModel(BaseChatModel):
+    """Stand-in for Groq that answers each agent prompt in the expected shape.
+
+    Every attempt goes through the real Groq scheduler and waits on `profile`,
+    so retries, backoff and concurrency limits behave as in production.
+    A `long_email_rate` share of first drafts break the word limit, which
+    exercises the critic's rewrite loop.
+    """
+
+    profile: Any
+    temperature: float = 0.0
+    model_name: str = "fake-groq"
+    long_email_rate: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    @staticmethod
+    def _qualifies(company: str) -> bool:
+        kind = company_kind(company)
+        return kind == "fit" or (kind == "adjacent" and stable_fraction("filter", company) < 0.5)
+
+    def _respond(self, prompt: str) -> Tuple[str, str]:
+        match = _FILTER.search(prompt)
+        if match:
+            company = match.group(1)
+            if self._qualifies(company):
+                return "filter", f"YES - {company} is investing in its sales team."
+            return "filter", f"NO - {company} shows no need for the product."
+        leads = _BATCH_FILTER.findall(prompt)
+        if leads:
+            verdicts = [
+                {"id": int(i), "answer": "YES", "reason": f"{company} is investing in its sales team."}
+                if self._qualifies(company) else
+                {"id": int(i), "answer": "NO", "reason": f"{company} shows no need for the product."}
+                for i, company in leads
+            ]
+            return "filter_batch", json.dumps({"verdicts": verdicts})
+        if "hypothetical success story" in prompt:
+            return "hyde", "A mid-sized firm used AI sales automation to cut lead research time by sixty percent."
+        match = _WRITER.search(prompt)
+        if match:
+            sender_company, sender_name, lead, company, product = match.groups()
+            rewrite = "cut it to at most" in prompt
+            long_draft = not rewrite and stable_fraction("long", lead, company) < self.long_email_rate
+            return "writer", _email(sender_company, sender_name, lead, company, product, 140 if long_draft else 60)
+        if "Review this cold email" in prompt:
+            return "critic", '{"is_perfect": true, "feedback": ""}'
+        return "other", "OK"
+
+    def _result(self, prompt: str, text: str) -> ChatResult:
+        usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(text)}
+        for kind, value in usage.items():
+            metrics.inc("agent_llm_tokens_total", value, model=self.model_name, kind=kind[:-len("_tokens")])
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text))],
+            llm_output={"token_usage": usage, "model_name": self.model_name},
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        kind, text = self._respond(prompt)
+        calls.add(f"llm:{kind}")
+
+        def attempt() -> ChatResult:
+            time.sleep(_attempt(self.profile))
+            return self._result(prompt, text)
+
+        return get_scheduler("groq", self.model_name).call(attempt, estimate_tokens(prompt))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        kind, text = self._respond(prompt)
+        calls.add(f"llm:{kind}")
+
+        async def attempt() -> ChatResult:
+            await asyncio.sleep(_attempt(self.profile))
+            return self._result(prompt, text)
+
+        return await get_scheduler("groq", self.model_name).acall(attempt, estimate_tokens(prompt))
+
+def llm_factory(profile: LatencyProfile, long_email_rate: float) -> Callable[[float, Optional[str]], BaseChatModel]:
+    """Factory for src.llm.set_llm_factory."""
+
+    def build(temp: float, model: Optional[str]) -> BaseChatModel:
+        return FakeChatModel(profile=profile, temperature=temp, long_email_rate=long_email_rate)
+
+    return build
+
+# --- SEARCH ---
+_NEWS_PREFIX = "latest business news "
+
+class FakeSearchAPI:
+    """Mimics TavilySearchAPIWrapper.results / results_async."""
+
+    def __init__(self, profile: LatencyProfile) -> None:
+        self.profile = profile
+
+    def _results(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        company = query[len(_NEWS_PREFIX):] if query.startswith(_NEWS_PREFIX) else query
+        return [
+            {"url": f"https://news.example/{i}", "content": company_text(company, i)}
+            for i in range(max_results)
+        ]
+
+    def results(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        calls.add("search")
+        time.sleep(_attempt(self.profile))
+        return self._results(query, max_results)
+
+    async def results_async(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        calls.add("search")
+        await asyncio.sleep(_attempt(self.profile))
+        return self._results(query, max_results)
+
+class FakeSearchTool:
+    """Stand-in for TavilySearchResults, for src.tools.set_search_tool."""
+
+    def __init__(self, profile: LatencyProfile, max_results: int = 5) -> None:
+        self.max_results = max_results
+        self.api_wrapper = FakeSearchAPI(profile)
+
+# --- EMBEDDINGS ---
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+class HashingEmbeddings(Embeddings):
+    """Bag-of-words feature hashing: fast, deterministic, and related texts score higher."""
+
+    def __init__(self, dim: int = 384) -> None:
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN.findall(text.lower()):
+            h = zlib.crc32(token.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 1 << 31 else -1.0
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+INDUSTRIES = ("logistics", "retail", "fintech", "healthcare", "manufacturing", "insurance", "media", "telecom")
+
+def build_case_index(embeddings: Embeddings, size: int = 64) -> CaseStudyIndex:
+    """A synthetic case-study library, for src.rag.set_case_index."""
+    texts = [
+        f"Case study {i}: a {INDUSTRIES[i % len(INDUSTRIES)]} company used AI sales automation "
+        f"to grow qualified pipeline by {20 + i % 50}% in one quarter."
+        for i in range(size)
+    ]
+    documents = [Document(page_content=t, metadata={"source": f"case-{i}"}) for i, t in enumerate(texts)]
+    return CaseStudyIndex(documents, embeddings.embed_documents(texts))
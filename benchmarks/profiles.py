@@ -0,0 +1,91 @@
+import random
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, Tuple
+
+# Share of synthetic companies per research profile. "fit" and "adjacent"
+# reach the LLM filter, "unrelated" is normally resolved by the local pre-check.
+KIND_WEIGHTS = (("fit", 40), ("adjacent", 30), ("unrelated", 30))
+
+FACTS = {
+    "fit": (
+        "{company} is rolling out AI sales solutions to automate lead research for its outbound sales team.",
+        "The {company} revenue team wants AI tools that qualify leads and draft sales emails.",
+        "{company} doubled its sales development headcount and is evaluating AI sales software.",
+    ),
+    "adjacent": (
+        "{company} announced a CRM migration and is hiring account executives across Europe.",
+        "{company} opened a new office and plans to grow its sales organisation next year.",
+        "Analysts expect {company} to invest in customer support and marketing tools.",
+    ),
+    "unrelated": (
+        "{company} reported quarterly results for its cement and aggregates business.",
+        "{company} completed maintenance at two quarries and expanded its rail freight fleet.",
+        "Regulators approved the {company} plan to extend a limestone mine by ten years.",
+    ),
+}
+
+FILLER = (
+    "Shares closed slightly higher after the announcement.",
+    "The company did not comment on future guidance.",
+    "Headquarters remain in the same city as last year.",
+    "Local press covered the story on Tuesday morning.",
+)
+
+def company_key(company: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", company.lower())
+
+def stable_fraction(*parts: str) -> float:
+    """Deterministic value in [0, 1) for the given strings."""
+    return zlib.crc32("\0".join(parts).encode("utf-8")) / 2 ** 32
+
+def company_kind(company: str) -> str:
+    point = stable_fraction("kind", company_key(company)) * sum(w for _, w in KIND_WEIGHTS)
+    for kind, weight in KIND_WEIGHTS:
+        if point < weight:
+            return kind
+        point -= weight
+    return KIND_WEIGHTS[-1][0]
+
+def company_text(company: str, variant: int = 0) -> str:
+    """A few sentences of research about `company`, consistent with its kind."""
+    facts = FACTS[company_kind(company)]
+    return " ".join((
+        facts[variant % len(facts)].format(company=company),
+        FILLER[variant % len(FILLER)],
+        facts[(variant + 1) % len(facts)].format(company=company),
+    ))
+
+class LatencyProfile:
+    """Per-call latency (base plus uniform jitter) and transient failure rate."""
+
+    def __init__(self, base: float, jitter: float = 0.0, failure_rate: float = 0.0, seed: int = 0) -> None:
+        self.base = base
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> Tuple[float, bool]:
+        """(seconds to wait, whether this attempt fails)."""
+        with self._lock:
+            return self.base + self._rng.uniform(0, self.jitter), self._rng.random() < self.failure_rate
+
+class CallCounter:
+    """Thread-safe tally of calls made to the stand-ins, by kind."""
+
+    def __init__(self) -> None:
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, kind: str) -> None:
+        with self._lock:
+            self._counts[kind] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+calls = CallCounter()
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Tuple
+
+from .profiles import LatencyProfile, calls
+from .sites import SiteServer
+
+DEFAULT_RESULTS_PATH = ".runs/benchmarks.jsonl"
+
+SENDER = {
+    "sender_name": "Bench Sender",
+    "sender_company": "Bench Systems",
+    "sender_product": "AI Sales Solutions",
+}
+
+def synthetic_leads(count: int, contacts_per_company: int) -> List[Tuple[str, str]]:
+    return [(f"Contact {i}", f"Company {i // contacts_per_company:05d}") for i in range(count)]
+
+def _offline_env(workdir: str) -> Dict[str, str]:
+    """Settings for a hermetic run; anything already set in the environment wins.
+
+    Remote quotas (RPM/TPM) are lifted so the numbers measure the pipeline,
+    not the free tier. Caches are off, so every scenario runs cold.
+    """
+    return {
+        "GROQ_API_KEY": "offline", "TAVILY_API_KEY": "offline",
+        "GROQ_RPM": "1000000", "GROQ_TPM": "0", "TAVILY_RPM": "1000000",
+        "RESEARCH_CACHE_TTL": "0", "LLM_CACHE_BACKEND": "none", "NEGATIVE_CACHE_TTL": "0",
+        "BREAKER_THRESHOLD": "1000000000", "RETRIEVAL_ENGINE": "numpy",
+        "CACHE_PATH": os.path.join(workdir, "research.sqlite"),
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm.sqlite"),
+        "CHECKPOINT_PATH": os.path.join(workdir, "checkpoints.sqlite"),
+        "MANIFEST_PATH": os.path.join(workdir, "manifest.sqlite"),
+        "NO_PROXY": "127.0.0.1,localhost", "no_proxy": "127.0.0.1,localhost",
+    }
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+# --- ONE SCENARIO (runs in its own process) ---
+def run_scenario(spec: Dict[str, Any]) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    for key, value in _offline_env(workdir).items():
+        os.environ.setdefault(key, value)
+
+    sites = SiteServer(
+        LatencyProfile(spec["site_latency"], spec["site_jitter"], seed=spec["seed"]),
+        dead_rate=spec["site_dead_rate"],
+    ).start()
+    os.environ["COMPANY_URL_TEMPLATE"] = sites.url_template
+
+    # src reads its Config at import time, so import only after the env is set
+    from src import llm, rag, tools
+    from src.batch import run_batch
+    from src.metrics import metrics
+    from .fakes import FakeSearchTool, HashingEmbeddings, build_case_index, llm_factory
+
+    llm.set_llm_factory(llm_factory(
+        LatencyProfile(spec["llm_latency"], spec["llm_jitter"], spec["llm_failure_rate"], spec["seed"]),
+        spec["long_email_rate"],
+    ))
+    tools.set_search_tool(FakeSearchTool(
+        LatencyProfile(spec["search_latency"], spec["search_jitter"], spec["search_failure_rate"], spec["seed"] + 1)
+    ))
+    if not spec["real_embeddings"]:
+        embeddings = HashingEmbeddings()
+        rag.set_embeddings(embeddings)
+        rag.set_case_index(build_case_index(embeddings))
+
+    leads = synthetic_leads(spec["leads"], spec["contacts_per_company"])
+    rss_before = _peak_rss_mb()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as quiet, redirect_stdout(quiet):
+        results = run_batch(leads, SENDER, spec["concurrency"], dedupe=spec["dedupe"])  # type: ignore[arg-type]
+    elapsed = time.perf_counter() - start
+    sites.stop()
+
+    report = metrics.report()
+    lead_latency = next((r for r in report["latencies"] if r["metric"] == "agent_lead_seconds"), {})
+    retries = sum(r["value"] for r in report["counters"] if r["metric"] == "agent_retries_total")
+    per_lead = {kind: count / len(leads) for kind, count in sorted(calls.snapshot().items())}
+    return {
+        **spec,
+        "elapsed_s": elapsed,
+        "leads_per_s": len(leads) / elapsed if elapsed else 0.0,
+        "p50_s": lead_latency.get("p50", 0.0),
+        "p95_s": lead_latency.get("p95", 0.0),
+        "p99_s": lead_latency.get("p99", 0.0),
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - rss_before,
+        "qualified": sum(1 for r in results if r["output"].get("is_qualified")),
+        "errors": sum(1 for r in results if r["error"]),
+        "retries": retries,
+        "calls_per_lead": per_lead,
+        "metrics": report,
+    }
+
+# --- DRIVER ---
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def _spawn(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one scenario in a fresh interpreter so RSS and caches don't leak between runs."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--worker", json.dumps(spec)],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"scenario {spec['leads']}x{spec['concurrency']} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def print_row(result: Dict[str, Any]) -> None:
+    llm_calls = sum(v for k, v in result["calls_per_lead"].items() if k.startswith("llm:"))
+    print(f"{result['leads']:>7} {result['concurrency']:>5} {result['elapsed_s']:>9.1f} "
+          f"{result['leads_per_s']:>8.2f} {result['p50_s']:>7.2f} {result['p95_s']:>7.2f} "
+          f"{result['peak_rss_mb']:>8.0f} {llm_calls:>8.2f} "
+          f"{result['calls_per_lead'].get('search', 0):>7.2f} {result['calls_per_lead'].get('site', 0):>6.2f} "
+          f"{result['errors']:>6}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark for the lead pipeline")
+    parser.add_argument("--leads", type=int, nargs="+", default=[100, 1000], help="Lead-set sizes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrency levels")
+    parser.add_argument("--contacts-per-company", type=int, default=1)
+    parser.add_argument("--no-dedupe", action="store_true", help="Run the full graph per lead")
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    parser.add_argument("--search-jitter", type=float, default=0.2)
+    parser.add_argument("--search-failure-rate", type=float, default=0.0)
+    parser.add_argument("--site-latency", type=float, default=0.05)
+    parser.add_argument("--site-jitter", type=float, default=0.1)
+    parser.add_argument("--site-dead-rate", type=float, default=0.1, help="Share of sites that always fail")
+    parser.add_argument("--long-email-rate", type=float, default=0.2, help="Share of drafts over the word limit")
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="Use EMBEDDING_MODEL and the Chroma store instead of hashing embeddings")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH, help="JSONL file the results are appended to")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scenario(json.loads(args.worker))))
+        sys.exit(0)
+
+    base = {
+        "contacts_per_company": args.contacts_per_company, "dedupe": not args.no_dedupe,
+        "llm_latency": args.llm_latency, "llm_jitter": args.llm_jitter, "llm_failure_rate": args.llm_failure_rate,
+        "search_latency": args.search_latency, "search_jitter": args.search_jitter,
+        "search_failure_rate": args.search_failure_rate,
+        "site_latency": args.site_latency, "site_jitter": args.site_jitter, "site_dead_rate": args.site_dead_rate,
+        "long_email_rate": args.long_email_rate, "real_embeddings": args.real_embeddings, "seed": args.seed,
+    }
+    revision = _git_revision()
+    print(f"🏎️  Offline benchmark @ {revision}")
+    print(f"{'leads':>7} {'conc':>5} {'wall s':>9} {'leads/s':>8} {'p50 s':>7} {'p95 s':>7} "
+          f"{'RSS MB':>8} {'llm/ld':>8} {'srch/ld':>7} {'web/ld':>6} {'errors':>6}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    for count in args.leads:
+        for concurrency in args.concurrency:
+            result = _spawn({**base, "leads": count, "concurrency": concurrency})
+            print_row(result)
+            with open(args.output, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"revision": revision, "timestamp": time.time(), **result}) + "\n")
+    print(f"\n💾 Results appended to {args.output}")
@@ -0,0 +1,95 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Sequence
+
+from .profiles import LatencyProfile, calls, company_text, stable_fraction
+
+# Page sizes in bytes; each domain is assigned one of them
+DEFAULT_SIZES = (2_000, 50_000, 500_000)
+
+def render_page(domain: str, size: int) -> bytes:
+    """An HTML page of roughly `size` bytes with scripts, styles and visible text."""
+    head = (
+        f"<html><head><title>{domain}</title>"
+        "<style>body { font-family: sans-serif; } .hero { color: #333; }</style>"
+        "<script>window.analytics = window.analytics || []; analytics.push('page');</script>"
+        "</head><body><nav>Home | Products | About | Careers</nav>"
+    )
+    paragraphs = []
+    used = len(head)
+    variant = 0
+    while used < size:
+        paragraph = f"<p>{company_text(domain, variant)}</p>"
+        paragraphs.append(paragraph)
+        used += len(paragraph)
+        variant += 1
+    return (head + "".join(paragraphs) + "</body></html>").encode("utf-8")
+
+class _FarmServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # high-concurrency runs open many sockets at once
+
+class SiteServer:
+    """Local website farm for scrape_website.
+
+    GET /<domain> returns a page whose size is picked per domain from `sizes`.
+    Every response waits on `profile`. A `dead_rate` share of domains always
+    answer 500, like sites that are down for the whole run.
+    """
+
+    def __init__(
+        self,
+        profile: LatencyProfile,
+        sizes: Sequence[int] = DEFAULT_SIZES,
+        dead_rate: float = 0.0,
+    ) -> None:
+        self.profile = profile
+        self.sizes = tuple(sizes)
+        self.dead_rate = dead_rate
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url_template(self) -> str:
+        """Value for Config.COMPANY_URL_TEMPLATE."""
+        if self._server is None:
+            raise RuntimeError("SiteServer is not started")
+        return f"http://127.0.0.1:{self._server.server_address[1]}/{{domain}}"
+
+    def start(self) -> "SiteServer":
+        farm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like real sites
+
+            def do_GET(self) -> None:
+                calls.add("site")
+                domain = self.path.strip("/")
+                delay, _ = farm.profile.sample()
+                time.sleep(delay)
+                if stable_fraction("dead", domain) < farm.dead_rate:
+                    self.send_error(500)
+                    return
+                size = farm.sizes[int(stable_fraction("size", domain) * len(farm.sizes))]
+                body = render_page(domain, size)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except ConnectionError:
+                    pass  # The scraper hangs up once it has enough text
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        self._server = _FarmServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, name="site-farm", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -1,24 +1,62 @@
+import subprocess
 import sys
+import time
+
+# Modules timed in the import report: the agent's own entry points first,
+# then the heavy dependencies they load lazily
+IMPORT_REPORT = [
+    "src.batch",
+    "src.graph",
+    "langgraph.graph",
+    "langchain_groq",
+    "langchain_community.vectorstores",
+    "langchain_community.tools.tavily_search",
+    "sentence_transformers",
+    "chromadb",
+]
+
+# Run in a fresh interpreter per module, so each number is that module's own cold cost
+TIMED_IMPORT = "import importlib, time; s = time.perf_counter(); importlib.import_module({!r}); print(time.perf_counter() - s)"
 
 print("⏳ Testing imports... (This might take 5-10 seconds)")
 
 try:
     import langchain
     print(f"✅ LangChain is ready (v{langchain.__version__})")
-    
+
     import langgraph
     print("✅ LangGraph is ready")
-    
+
     import chromadb
     print(f"✅ ChromaDB is ready (v{chromadb.__version__})")
-    
+
     from langchain_groq import ChatGroq
     print("✅ Groq Connector is ready")
-    
+
     print("\n🎉 SUCCESS: All systems go! You are ready to build the Agent.")
-    
+
 except ImportError as e:
     print(f"\n❌ IMPORT ERROR: {e}")
     print("Try running: pip install -r requirements.txt")
+    sys.exit(1)
 except Exception as e:
-    print(f"\n❌ SYSTEM ERROR: {e}")
\ No newline at end of file
+    print(f"\n❌ SYSTEM ERROR: {e}")
+    sys.exit(1)
+
+print("\n⏱️  IMPORT TIMES (cold, seconds)")
+for name in IMPORT_REPORT:
+    proc = subprocess.run([sys.executable, "-c", TIMED_IMPORT.format(name)], capture_output=True, text=True)
+    took = f"{float(proc.stdout.strip()):.2f}" if proc.returncode == 0 else "failed"
+    print(f"   {name:<42} {took}")
+
+from dotenv import load_dotenv
+load_dotenv()
+from src.resources import statuses, warm_up
+
+print("\n🔥 WARM-UP (seconds)")
+start = time.perf_counter()
+warm_up(background=False)
+for status in statuses():
+    took = f"{status['seconds']:.2f}" if status["seconds"] is not None else "skipped"
+    print(f"   {status['name']:<42} {took}" + (f"  ⚠️ {status['error']}" if status["error"] else ""))
+print(f"   {'total':<42} {time.perf_counter() - start:.2f}")
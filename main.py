@@ -1,57 +1,193 @@
 # main.py
-import pandas as pd
-from src.graph import app
+import argparse
+import multiprocessing
+import os
+from typing import Optional
+from src.batch import LeadResult, Sender, run_to_sink, run_worker, sender_fields
+from src.cache import get_disk_cache
+from src.config import Config
+from src.manifest import RunManifest
+from src.metrics import metrics, serve_prometheus
+from src.resources import warm_up
+from src.streams import ResultSink, count_rows, iter_leads, remove_results
+from src.workqueue import WorkQueue
 
-def run():
+DEFAULT_LEADS_PATH = "data/leads.csv"
+
+SENDER: Sender = {
+    "sender_name": "AI Sales Agent",
+    "sender_company": "Automated Systems",
+    "sender_product": "AI Sales Solutions",
+}
+
+def print_result(result: LeadResult) -> None:
+    lead_name = result['lead_name']
+    print(f"\n--- FINISHED: {lead_name} ({result['company']}) ---")
+
+    if result['error']:
+        print(f"❌ ERROR processing {lead_name}: {result['error']}")
+        return
+
+    output = result['output']
+    if output.get('is_qualified'):
+        print(f"✅ QUALIFIED! Draft Email:\n")
+        print("-" * 40)
+        print(output.get('draft_email', ''))
+        print("-" * 40)
+    else:
+        print(f"🚫 DISQUALIFIED: {output.get('qualification_reason', '')}")
+
+def print_metrics() -> None:
+    report = metrics.report()
+    print("\n⏱️  LATENCY (seconds)")
+    for row in report['latencies']:
+        label = row.get('node') or row.get('provider') or row.get('batcher', '')
+        print(f"   {row['metric']:<30} {label:<28} n={row['count']:<5} "
+              f"p50={row['p50']:.2f} p95={row['p95']:.2f} p99={row['p99']:.2f}")
+    for row in report['counters']:
+        labels = ", ".join(f"{k}={v}" for k, v in row.items() if k not in ('metric', 'value'))
+        print(f"   {row['metric']:<30} {labels:<28} {row['value']:.0f}")
+    if get_disk_cache.ready:
+        print("\n💾 RESEARCH CACHE")
+        for namespace, counts in get_disk_cache().stats().items():
+            looked_up = counts['hits'] + counts['misses']
+            print(f"   {namespace:<12} {counts['hits']} hits / {looked_up} lookups "
+                  f"({counts['hits'] / looked_up:.0%})")
+
+def run(
+    concurrency: Optional[int] = None,
+    leads_path: str = DEFAULT_LEADS_PATH,
+    resume: Optional[str] = None,
+    output: Optional[str] = None,
+):
     print("🚀 STARTING AI SALES AGENT...")
-    
-    # 1. Load the Leads
-    try:
-        leads = pd.read_csv("data/leads.csv")
-        print(f"📄 Loaded {len(leads)} leads from CSV.")
-    except FileNotFoundError:
-        print("❌ ERROR: data/leads.csv not found. Please create it.")
+    # Load models, vector store and graphs while the CSV is being read
+    warm_up(verbose=True)
+
+    # 0. Find the Leads (and the sender, when resuming)
+    manifest = RunManifest()
+    sender = SENDER
+    previous = manifest.get_run(resume) if resume else None
+    if resume and previous is None:
+        print(f"❌ ERROR: no run with id {resume}.")
+        return
+    if previous is not None:
+        leads_path, sender = previous['leads_path'], Sender(**previous['sender'])
+    if not os.path.exists(leads_path):
+        print(f"❌ ERROR: {leads_path} not found. Please create it.")
+        return
+
+    # 1. Open (or resume) a durable run
+    if resume:
+        run_id = resume
+        print(f"🔁 Resuming run {run_id} over {leads_path}")
+    else:
+        run_id = manifest.create_run(leads_path, sender_fields(sender))
+        print(f"🧾 Run id: {run_id} (resume with: python main.py --resume {run_id})")
+    # Leads are streamed in chunks, never fully loaded
+    print(f"📄 Found {count_rows(leads_path)} leads in CSV.")
+
+    # 2. Process the Leads concurrently, appending each result to disk
+    limit = concurrency or Config.BATCH_CONCURRENCY
+    run_dir = os.path.join(os.path.dirname(Config.MANIFEST_PATH), run_id)
+    output_path = output or os.path.join(run_dir, "results")
+    if Config.METRICS_PORT:
+        serve_prometheus(Config.METRICS_PORT, Config.METRICS_HOST)
+        print(f"📈 Metrics at http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics")
+    print(f"⚡ Processing with up to {limit} leads in parallel, writing to {output_path}.*")
+    with ResultSink(output_path) as sink:
+        run_to_sink(iter_leads(leads_path), sender, sink, limit, on_result=print_result, run_id=run_id)
+
+    # 3. Export per-node latency, token usage and cache hits for this pass
+    metrics.write_report(os.path.join(run_dir, "metrics.json"))
+    metrics.write_prometheus(os.path.join(run_dir, "metrics.prom"))
+    print_metrics()
+
+    counts = manifest.counts(run_id)
+    failed = counts.get('failed', 0)
+    print(f"\n🏁 DONE: {sink.written} leads this pass ({sink.qualified} qualified, {sink.failed} errors); "
+          f"{counts.get('done', 0)} finished in this run overall.")
+    if failed:
+        print(f"🔁 Retry the failed leads with: python main.py --resume {run_id}")
+
+# --- WORKER MODE ---
+def enqueue(leads_path: str = DEFAULT_LEADS_PATH) -> None:
+    if not os.path.exists(leads_path):
+        print(f"❌ ERROR: {leads_path} not found. Please create it.")
+        return
+    queue = WorkQueue()
+    queue_id = queue.create(sender_fields(SENDER), leads_path)
+    added = queue.enqueue(
+        queue_id,
+        ((index, {"lead_name": name, "company": company}) for index, (name, company) in enumerate(iter_leads(leads_path))),
+    )
+    print(f"📥 Queued {added} leads as {queue_id} in {Config.QUEUE_PATH}")
+    print(f"👷 Start workers (on any machine sharing that file) with: python main.py --worker {queue_id} --processes N")
+
+def _worker_process(queue_id: str, concurrency: Optional[int], number: int) -> None:
+    # Metrics live in each worker process, so each one serves its own endpoint
+    if Config.METRICS_PORT:
+        serve_prometheus(Config.METRICS_PORT + number, Config.METRICS_HOST)
+        print(f"📈 Worker {number} metrics at http://{Config.METRICS_HOST}:{Config.METRICS_PORT + number}/metrics")
+    warm_up()
+    processed = run_worker(queue_id, concurrency, on_result=print_result)
+    print(f"👷 Worker {os.getpid()} finished after {processed} leads.")
+
+def work(queue_id: str, processes: int = 1, concurrency: Optional[int] = None, output: Optional[str] = None) -> None:
+    """Runs `processes` workers on this machine until the queue is drained."""
+    if WorkQueue().get(queue_id) is None:
+        print(f"❌ ERROR: no queue with id {queue_id}.")
         return
+    print(f"🚀 Draining queue {queue_id} with {processes} worker process(es)...")
+    # Separate processes, so parsing and embedding use every core instead of sharing one GIL
+    workers = [
+        multiprocessing.Process(target=_worker_process, args=(queue_id, concurrency, n), name=f"worker-{n}")
+        for n in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    export(queue_id, output)
 
-    # 2. Process Each Lead
-    for index, row in leads.iterrows():
-        lead_name = row['name']
-        company = row['company']
-        
-        print(f"\n--- PROCESSING: {lead_name} ({company}) ---")
-        
-        # Initialize the state with basic info
-        initial_state = {
-            "sender_name": "AI Sales Agent",
-            "sender_company": "Automated Systems",
-            "sender_product": "AI Sales Solutions",
-            "lead_name": lead_name,
-            "company": company,
-            "research_snippets": [],
-            "research_summary": "",
-            "is_qualified": False,
-            "qualification_reason": "",
-            "draft_email": "",
-            "critique_feedback": None,
-            "is_perfect": False,
-            "iteration_count": 0
-        }
-        
-        # Run the Graph!
-        try:
-            result = app.invoke(initial_state)
-            
-            # Print the Result
-            if result['is_qualified']:
-                print(f"✅ QUALIFIED! Draft Email:\n")
-                print("-" * 40)
-                print(result['draft_email'])
-                print("-" * 40)
-            else:
-                print(f"🚫 DISQUALIFIED: {result['qualification_reason']}")
-                
-        except Exception as e:
-            print(f"❌ ERROR processing {lead_name}: {e}")
+def export(queue_id: str, output: Optional[str] = None) -> None:
+    """Writes a queue's results, in input order, to JSONL/CSV; safe to repeat."""
+    queue = WorkQueue()
+    counts = queue.counts(queue_id)
+    output_path = output or os.path.join(os.path.dirname(Config.QUEUE_PATH), f"queue-{queue_id}", "results")
+    # Rewritten from scratch each time, since the queue holds the full result set
+    remove_results(output_path)
+    with ResultSink(output_path) as sink:
+        for result in queue.results(queue_id):
+            sink.write(result)
+    print(f"\n🏁 Queue {queue_id}: {counts.get('done', 0)} done, {counts.get('failed', 0)} failed, "
+          f"{counts.get('pending', 0) + counts.get('leased', 0)} still open; "
+          f"{sink.written} results ({sink.qualified} qualified) written to {output_path}.*")
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the AI Sales Agent over a CSV of leads")
+    parser.add_argument("--leads", default=DEFAULT_LEADS_PATH,
+                        help=f"CSV with 'name' and 'company' columns (default: {DEFAULT_LEADS_PATH})")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help=f"Leads processed in parallel (default: {Config.BATCH_CONCURRENCY})")
+    parser.add_argument("--resume", metavar="RUN_ID", default=None,
+                        help="Resume an interrupted run, skipping leads it already finished")
+    parser.add_argument("--output", default=None,
+                        help="Result path prefix; .jsonl/.csv are appended (default: .runs/<run id>/results)")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Put the leads into the work queue instead of processing them here")
+    parser.add_argument("--worker", metavar="QUEUE_ID", default=None,
+                        help="Process leads from a queue created with --enqueue")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Worker processes to start with --worker (default: 1)")
+    parser.add_argument("--export", metavar="QUEUE_ID", default=None,
+                        help="Write a queue's results so far to --output")
+    args = parser.parse_args()
+    if args.enqueue:
+        enqueue(args.leads)
+    elif args.worker:
+        work(args.worker, args.processes, args.concurrency, args.output)
+    elif args.export:
+        export(args.export, args.output)
+    else:
+        run(args.concurrency, args.leads, args.resume, args.output)
@@ -1,80 +1,116 @@
 from typing import Any, Dict, List
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_groq import ChatGroq
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 
 from .state import AgentState
 from .rag import get_hyde_retriever
-from .tools import get_search_tool, scrape_website
+from .tools import search_web, asearch_web, scrape_website, ascrape_website
 from .config import Config
-
-def get_llm(temp: float = 0.0) -> ChatGroq:
-    return ChatGroq(model=Config.LLM_MODEL, temperature=temp)
+from .critic import local_critique
+from .llm import get_llm
+from .prequal import prequalify
+from .qualify import QualifyRequest, get_qualify_batcher, qualify_one
+from .summary import build_summary
 
 # --- PARALLEL NODE 1 ---
-def news_node(state: AgentState) -> Dict[str, Any]:
-    print(f"📰 Searching news for: {state['company']}...")
-    search = get_search_tool()
-    results: Any = search.invoke(f"latest business news {state['company']}")
-    
+def _news_query(state: AgentState) -> str:
+    return f"latest business news {state['company']}"
+
+def _extract_snippets(results: Any) -> List[str]:
     snippets: List[str] = []
     if isinstance(results, list):
         for res in results:
             if isinstance(res, dict) and "content" in res:
                 snippets.append(str(res["content"]))
-    return {"research_snippets": snippets}
+    return snippets
+
+# A failed search raises SearchFailed, which fails the lead so a resume (or
+# the work queue) retries it; an empty result list is a genuine "no news"
+def news_node(state: AgentState) -> Dict[str, Any]:
+    print(f"📰 Searching news for: {state['company']}...")
+    results: Any = search_web(_news_query(state))
+    return {"research_snippets": _extract_snippets(results)}
+
+async def anews_node(state: AgentState) -> Dict[str, Any]:
+    print(f"📰 Searching news for: {state['company']}...")
+    results: Any = await asearch_web(_news_query(state))
+    return {"research_snippets": _extract_snippets(results)}
 
 # --- PARALLEL NODE 2 ---
+def _company_url(state: AgentState) -> str:
+    return Config.COMPANY_URL_TEMPLATE.format(domain=state['company'].lower().replace(' ', ''))
+
 def tech_node(state: AgentState) -> Dict[str, Any]:
     print(f"💻 Scraping website for: {state['company']}...")
-    url = f"https://www.{state['company'].lower().replace(' ', '')}.com"
-    content = scrape_website(url)
+    content = scrape_website(_company_url(state))
     return {"research_snippets": [content]}
 
+async def atech_node(state: AgentState) -> Dict[str, Any]:
+    print(f"💻 Scraping website for: {state['company']}...")
+    content = await ascrape_website(_company_url(state))
+    return {"research_snippets": [content]}
+
+def build_research_summary(state: AgentState) -> str:
+    # Deduplicated, relevance-ranked and token-budgeted (see src/summary.py)
+    return build_summary(
+        state.get('research_snippets', []),
+        state['company'],
+        state.get('sender_product', 'our services'),
+    )
+
 # --- FILTER NODE ---
 def filter_node(state: AgentState) -> Dict[str, Any]:
-    print(f"🛡️ Filtering {state['lead_name']}...")
-    snippets = state.get('research_snippets', [])
-    summary = "\n".join(snippets) if snippets else "General research."
+    # Qualification is company-scoped: it must not depend on the contact, so
+    # the batch runner can share one verdict across everyone at a company.
+    print(f"🛡️ Filtering {state['company']}...")
+    summary = build_research_summary(state)
+    product = state.get('sender_product', 'our services')
 
-    # We use a simple string check first to avoid JSON parsing drama
-    # STRICT PROMPT: We want deterministic YES/NO.
-    prompt = ChatPromptTemplate.from_template(
-        "Based on this research: {summary}\n\n"
-        "Should we reach out to {name} at {company} regarding {product}?\n"
-        "CRITICAL RULES:\n"
-        "1. Answer 'YES' if the company is in a relevant industry or fits the product context.\n"
-        "2. Answer 'NO' ONLY if the company doesn't exist, is out of business, or is completely irrelevant.\n"
-        "3. Answer with 'YES' or 'NO' first, then a short reason."
-    )
-    
-    # Get raw text response
-    # Reduce temperature to 0.0 for deterministic results
-    raw_res = (prompt | get_llm(0.0) | StrOutputParser()).invoke({
-        "summary": summary,
-        "name": state['lead_name'],
-        "company": state['company'],
-        "product": state.get('sender_product', 'our services')
-    })
+    # Cheap cascade first: clear-cut leads are decided locally, only the
+    # ambiguous middle goes to Groq
+    if Config.PREQUAL_ENABLED:
+        decision = prequalify(state.get('research_snippets', []), product)
+        if decision is not None:
+            verdict = "YES" if decision["is_qualified"] else "NO"
+            return {
+                "is_qualified": decision["is_qualified"],
+                "qualification_reason": f"{verdict} (local pre-check): {decision['reason']}",
+                "research_summary": summary
+            }
+
+    request: QualifyRequest = {"company": state['company'], "product": product, "summary": summary}
+    if Config.BATCH_QUALIFICATION:
+        # Waits briefly for other leads' filters, then shares one Groq request with them
+        outcome = get_qualify_batcher()(request)
+    else:
+        outcome = qualify_one(request)
 
-    # Simple Logic: If it says 'NO' (case insensitive), we disqualify. 
-    # Otherwise, we go for it!
-    is_qual = not raw_res.strip().upper().startswith("NO")
-    
     return {
-        "is_qualified": is_qual, 
-        "qualification_reason": raw_res, 
+        "is_qualified": outcome["is_qualified"],
+        "qualification_reason": outcome["reason"],
         "research_summary": summary
     }
 
+# --- CASE STUDY NODE ---
+def _retrieve_case_study(company: str, summary: str) -> str:
+    search_func = get_hyde_retriever()
+    docs = search_func(company, summary)
+    return docs[0].page_content if docs else "We help similar companies scale."
+
+def case_study_node(state: AgentState) -> Dict[str, Any]:
+    # Speculative: runs next to filter_node on the same inputs, so the HyDE
+    # call is off the critical path. Disqualified leads simply never read it.
+    print(f"📚 Pre-fetching case study for: {state['company']}...")
+    return {"case_study": _retrieve_case_study(state['company'], build_research_summary(state))}
+
 # --- WRITER NODE ---
 def writer_node(state: AgentState) -> Dict[str, Any]:
     print(f"✍️ Drafting email for: {state['lead_name']}...")
     
-    # Retrieve proof/case study from vector DB
-    search_func = get_hyde_retriever()
-    docs = search_func(state['company'], state.get('research_summary', ''))
-    case_study = docs[0].page_content if docs else "We help similar companies scale."
+    # Retrieve proof/case study from vector DB (unless prefetched speculatively)
+    case_study = state.get('case_study') or _retrieve_case_study(
+        state['company'], state.get('research_summary', '')
+    )
     
     # Extract sender info with fallback defaults
     s_name = state.get('sender_name', 'John')
@@ -107,13 +143,28 @@ def writer_node(state: AgentState) -> Dict[str, Any]:
         "feedback": state.get('critique_feedback', "")
     })
     
-    return {"draft_email": str(email)}
+    return {"draft_email": str(email), "case_study": case_study}
+
 # --- CRITIC NODE ---
 def critic_node(state: AgentState) -> Dict[str, Any]:
     iteration = state.get("iteration_count", 0)
     if iteration >= 1: # Stop loop after 1 rewrite
         return {"is_perfect": True, "iteration_count": iteration + 1}
         
+    # Tier 1: exact, local checks (length, placeholders, sign-off, readability).
+    # A draft that breaks a hard rule goes straight back with precise feedback.
+    draft = state.get('draft_email', '')
+    if Config.LOCAL_CRITIC:
+        issues = local_critique(
+            draft,
+            state.get('sender_name', 'John'),
+            state.get('sender_company', 'AI Sales Pro'),
+        )
+        if issues:
+            print(f"📏 Local critic found {len(issues)} issue(s) (Attempt {iteration + 1})...")
+            return {"is_perfect": False, "critique_feedback": " ".join(issues), "iteration_count": iteration + 1}
+
+    # Tier 2: the LLM only judges tone on drafts that pass the hard rules
     print(f"🧐 Critiquing draft (Attempt {iteration + 1})...")
     prompt = ChatPromptTemplate.from_template(
         "Review this cold email: {draft}. Is it natural and under 100 words? "
@@ -121,7 +172,7 @@ def critic_node(state: AgentState) -> Dict[str, Any]:
     )
     
     try:
-        res: Any = (prompt | get_llm() | JsonOutputParser()).invoke({"draft": state.get('draft_email', '')})
+        res: Any = (prompt | get_llm() | JsonOutputParser()).invoke({"draft": draft})
         is_perf = bool(res.get('is_perfect', False)) if isinstance(res, dict) else False
         feedback = str(res.get('feedback', '')) if isinstance(res, dict) else ""
     except Exception:
@@ -0,0 +1,444 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Generic, Iterable, List, Optional, Set,
+    Tuple, TypedDict, TypeVar, cast,
+)
+
+from .config import Config
+from .fetch import aclose_async_client
+from .manifest import RunManifest
+from .metrics import metrics
+from .state import AgentState
+from .streams import ResultSink
+from .workqueue import WorkQueue, worker_id
+
+# LangGraph and the agents (and everything they import) load with the first
+# pipeline, so importing this module for its types stays cheap
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from .graph import Checkpointer, CompiledGraph
+
+T = TypeVar("T")
+
+# A lead is a (lead_name, company) pair, in input order
+Lead = Tuple[str, str]
+
+class Sender(TypedDict):
+    sender_name: str
+    sender_company: str
+    sender_product: str
+
+class LeadResult(TypedDict):
+    index: int
+    lead_name: str
+    company: str
+    output: Dict[str, Any]
+    error: Optional[str]
+
+def sender_fields(sender: Sender) -> Dict[str, str]:
+    """The sender as a plain dict, as the run manifest and work queue store it."""
+    return {
+        "sender_name": sender["sender_name"],
+        "sender_company": sender["sender_company"],
+        "sender_product": sender["sender_product"],
+    }
+
+def build_initial_state(lead_name: str, company: str, sender: Sender) -> AgentState:
+    return {
+        "sender_name": sender["sender_name"],
+        "sender_company": sender["sender_company"],
+        "sender_product": sender["sender_product"],
+        "lead_name": lead_name,
+        "company": company,
+        "research_snippets": [],
+        "research_summary": "",
+        "is_qualified": False,
+        "qualification_reason": "",
+        "case_study": None,
+        "draft_email": "",
+        "critique_feedback": None,
+        "is_perfect": False,
+        "iteration_count": 0
+    }
+
+def normalize_company(company: str) -> str:
+    """Grouping key for company-scoped work ("  ACME  corp" == "acme corp")."""
+    return " ".join(company.casefold().split())
+
+class SingleFlight(Generic[T]):
+    """Runs each keyed coroutine at most once at a time; every caller awaits the same task.
+
+    Successful results stay available for the `keep` most recently used keys,
+    so later contacts at a company reuse its research without memory growing
+    with the batch. A task that fails (or is cancelled) is forgotten as soon
+    as it ends, so the next caller runs it again instead of replaying the error.
+    """
+
+    def __init__(self, keep: int = 1024) -> None:
+        self.keep = keep
+        self._running: Dict[str, "asyncio.Task[T]"] = {}
+        self._finished: "OrderedDict[str, asyncio.Task[T]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._running) + len(self._finished)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._finished.get(key)
+        if task is not None:
+            self._finished.move_to_end(key)
+        else:
+            task = self._running.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._running[key] = task
+                task.add_done_callback(lambda t: self._settle(key, t))
+        # Shield so one cancelled waiter doesn't cancel the work for the others
+        return await asyncio.shield(task)
+
+    def _settle(self, key: str, task: "asyncio.Task[T]") -> None:
+        self._running.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._finished[key] = task
+        while len(self._finished) > self.keep:
+            self._finished.popitem(last=False)
+
+class _Pipeline:
+    """The compiled graphs used by one batch.
+
+    With a run id, every graph is compiled with a checkpointer and each
+    invocation gets a stable thread id, so a resumed run picks up finished
+    threads as-is and interrupted ones from their last completed node.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, checkpointer: Optional["Checkpointer"] = None) -> None:
+        from .graph import (
+            build_app, build_outreach_app, build_research_app, get_app, get_outreach_app, get_research_app
+        )
+
+        self.run_id = run_id
+        if checkpointer is None:
+            self.app, self.research_app, self.outreach_app = get_app(), get_research_app(), get_outreach_app()
+        else:
+            self.app = build_app(checkpointer)
+            self.research_app = build_research_app(checkpointer)
+            self.outreach_app = build_outreach_app(checkpointer)
+
+    async def invoke(self, graph: "CompiledGraph", state: Dict[str, Any], thread: str) -> Dict[str, Any]:
+        # Callers pass whole states (a fresh lead, or a company's state plus the contact)
+        inputs = cast(AgentState, state)
+        if self.run_id is None:
+            return dict(await graph.ainvoke(inputs))
+
+        config: "RunnableConfig" = {"configurable": {"thread_id": f"{self.run_id}:{thread}"}}
+        snapshot = await graph.aget_state(config)
+        if snapshot.values:
+            if not snapshot.next:
+                return dict(snapshot.values)  # Finished before the crash
+            return dict(await graph.ainvoke(None, config))  # Resume from the last completed node
+        return dict(await graph.ainvoke(inputs, config))
+
+async def _run_deduplicated(
+    state: AgentState, index: int, flights: "SingleFlight[Dict[str, Any]]", pipeline: _Pipeline
+) -> Dict[str, Any]:
+    """Shares research + qualification per company, then drafts per contact."""
+    key = f"{normalize_company(state['company'])}\0{state['sender_product']}"
+    company_thread = "company:" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+    async def research() -> Dict[str, Any]:
+        return await pipeline.invoke(pipeline.research_app, dict(state), company_thread)
+
+    company_state = await flights.do(key, research)
+    lead_state: Dict[str, Any] = {**company_state, "lead_name": state["lead_name"], "company": state["company"]}
+    if not company_state.get("is_qualified"):
+        return lead_state
+    return await pipeline.invoke(pipeline.outreach_app, lead_state, f"lead:{index}")
+
+async def process_lead(
+    index: int,
+    lead_name: str,
+    company: str,
+    sender: Sender,
+    use_dedupe: bool,
+    flights: "SingleFlight[Dict[str, Any]]",
+    pipeline: _Pipeline,
+) -> LeadResult:
+    """Runs one lead through the pipeline; errors are captured on the result, never raised."""
+    try:
+        state = build_initial_state(lead_name, company, sender)
+        with metrics.timer("agent_lead_seconds", errors="agent_lead_errors_total"):
+            if use_dedupe:
+                output: Any = await _run_deduplicated(state, index, flights, pipeline)
+            else:
+                output = await pipeline.invoke(pipeline.app, dict(state), f"lead:{index}")
+        return {
+            "index": index, "lead_name": lead_name, "company": company,
+            "output": dict(output), "error": None
+        }
+    except Exception as e:
+        return {
+            "index": index, "lead_name": lead_name, "company": company,
+            "output": {}, "error": str(e)
+        }
+
+async def _aiter(
+    leads: Iterable[Lead],
+    sender: Sender,
+    limit: int,
+    on_result: Optional[Callable[[LeadResult], None]],
+    use_dedupe: bool,
+    pipeline: _Pipeline,
+    manifest: Optional[RunManifest],
+) -> AsyncIterator[LeadResult]:
+    semaphore = asyncio.Semaphore(limit)
+    flights: SingleFlight[Dict[str, Any]] = SingleFlight(Config.DEDUPE_CACHE_SIZE)
+    finished: Set[int] = set()
+    if manifest is not None and pipeline.run_id is not None:
+        finished = manifest.finished(pipeline.run_id)
+        if finished:
+            print(f"⏭️ Skipping {len(finished)} leads finished in a previous attempt.")
+
+    async def run_one(index: int, lead_name: str, company: str) -> LeadResult:
+        async with semaphore:
+            result = await process_lead(index, lead_name, company, sender, use_dedupe, flights, pipeline)
+        # Callbacks fire in completion order, results are yielded in input order
+        if on_result:
+            on_result(result)
+        return result
+
+    def record(result: LeadResult) -> None:
+        # Called only once the consumer has taken the result (e.g. written it to
+        # the sink), so a crash never marks a lead finished that isn't on disk
+        if manifest is not None and pipeline.run_id is not None:
+            manifest.record(pipeline.run_id, result["index"], dict(result))
+
+    # Only a bounded window of leads is in memory at once. Leads are pulled
+    # lazily from the iterator and results leave in input order, so a slow
+    # lead holds back at most `window` finished ones behind it.
+    window = limit * 4
+    pending: Deque["asyncio.Task[LeadResult]"] = deque()
+    try:
+        for index, (name, company) in enumerate(leads):
+            if index in finished:
+                continue
+            pending.append(asyncio.ensure_future(run_one(index, name, company)))
+            if len(pending) >= window:
+                result = await pending.popleft()
+                yield result
+                record(result)
+        while pending:
+            result = await pending.popleft()
+            yield result
+            record(result)
+    finally:
+        for task in pending:
+            task.cancel()
+        await aclose_async_client()
+
+# --- BATCH RUNNER ---
+async def aiter_batch(
+    leads: Iterable[Lead],
+    sender: Sender,
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[LeadResult], None]] = None,
+    dedupe: Optional[bool] = None,
+    run_id: Optional[str] = None,
+) -> AsyncIterator[LeadResult]:
+    """Runs the graph over many leads with at most `concurrency` in flight.
+
+    Results are yielded in input order and memory stays bounded however long
+    `leads` is. A failing lead never aborts the batch; its error message is
+    recorded on its LeadResult instead. With `dedupe` (default
+    Config.DEDUPE_COMPANIES), contacts at the same company share one research
+    and qualification run.
+
+    Passing a `run_id` (see RunManifest.create_run) makes the batch durable:
+    graph state is checkpointed to SQLite and finished leads are recorded, so
+    calling again with the same run id only does (and yields) the remaining work.
+    A lead is recorded only after the consumer has handled its result, so a
+    lead finished but not yet yielded at a crash is yielded again on resume
+    (cheaply, from its checkpoint).
+    """
+    limit = concurrency or Config.BATCH_CONCURRENCY
+    use_dedupe = Config.DEDUPE_COMPANIES if dedupe is None else dedupe
+    if run_id is None:
+        async for result in _aiter(leads, sender, limit, on_result, use_dedupe, _Pipeline(), None):
+            yield result
+        return
+
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    os.makedirs(os.path.dirname(Config.CHECKPOINT_PATH) or ".", exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(Config.CHECKPOINT_PATH) as saver:
+        pipeline = _Pipeline(run_id, saver)
+        async for result in _aiter(leads, sender, limit, on_result, use_dedupe, pipeline, RunManifest()):
+            yield result
+
+async def arun_batch(
+    leads: Iterable[Lead],
+    sender: Sender,
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[LeadResult], None]] = None,
+    dedupe: Optional[bool] = None,
+    run_id: Optional[str] = None,
+) -> List[LeadResult]:
+    """Collects aiter_batch into a list; fine for small batches."""
+    return [r async for r in aiter_batch(leads, sender, concurrency, on_result, dedupe, run_id)]
+
+def run_batch(
+    leads: Iterable[Lead],
+    sender: Sender,
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[LeadResult], None]] = None,
+    dedupe: Optional[bool] = None,
+    run_id: Optional[str] = None,
+) -> List[LeadResult]:
+    """Synchronous entry point for scripts and Streamlit."""
+    return asyncio.run(arun_batch(leads, sender, concurrency, on_result, dedupe, run_id))
+
+async def arun_to_sink(
+    leads: Iterable[Lead],
+    sender: Sender,
+    sink: ResultSink,
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[LeadResult], None]] = None,
+    dedupe: Optional[bool] = None,
+    run_id: Optional[str] = None,
+) -> None:
+    """Streams results straight to disk; nothing accumulates in memory."""
+    async for result in aiter_batch(leads, sender, concurrency, on_result, dedupe, run_id):
+        sink.write(dict(result))
+
+def run_to_sink(
+    leads: Iterable[Lead],
+    sender: Sender,
+    sink: ResultSink,
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[LeadResult], None]] = None,
+    dedupe: Optional[bool] = None,
+    run_id: Optional[str] = None,
+) -> None:
+    asyncio.run(arun_to_sink(leads, sender, sink, concurrency, on_result, dedupe, run_id))
+
+# --- QUEUE WORKER ---
+# Writes to the shared queue file can wait on other workers' locks; retry a few times before giving up
+QUEUE_WRITE_ATTEMPTS = 3
+
+async def _queue_io(fn: Callable[..., T], *args: Any, attempts: int = 1) -> T:
+    """Runs a WorkQueue call in a thread, so lock waits never stall the leads in flight."""
+    attempt = 1
+    while True:
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except sqlite3.Error:
+            if attempt >= attempts:
+                raise
+            await asyncio.sleep(Config.QUEUE_POLL_INTERVAL * attempt)
+            attempt += 1
+
+async def arun_worker(
+    queue_id: str,
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[LeadResult], None]] = None,
+    dedupe: Optional[bool] = None,
+    queue: Optional[WorkQueue] = None,
+) -> int:
+    """Drains a WorkQueue with at most `concurrency` leads in flight; returns how many it stored.
+
+    Run as many workers as there are cores (or machines sharing the queue
+    file). Each leases only as many leads as it has free slots, renews its
+    leases while they run and writes each result back to the queue. A
+    worker that shuts down hands its unfinished leads back; if one dies,
+    its leases expire and another worker picks the leads up.
+    """
+    queue = queue or WorkQueue()
+    meta = await _queue_io(queue.get, queue_id)
+    if meta is None:
+        raise ValueError(f"no queue with id {queue_id}")
+    sender = Sender(**meta["sender"])
+    limit = concurrency or Config.BATCH_CONCURRENCY
+    use_dedupe = Config.DEDUPE_COMPANIES if dedupe is None else dedupe
+    owner = worker_id()
+    visibility = Config.QUEUE_VISIBILITY_TIMEOUT
+    pipeline = _Pipeline()
+    running: Dict["asyncio.Task[LeadResult]", int] = {}
+    processed = 0
+    last_heartbeat = time.monotonic()
+
+    try:
+        while True:
+            free = limit - len(running)
+            if free > 0:
+                try:
+                    leased = await _queue_io(queue.lease, queue_id, owner, free, visibility, Config.QUEUE_MAX_ATTEMPTS)
+                except sqlite3.Error as e:
+                    print(f"⚠️ Could not lease leads ({e}); trying again.")
+                    leased = []
+                # Contacts leased together share company research; a fresh scope per
+                # lease means a retried lead always researches again instead of
+                # replaying an earlier attempt's failure
+                flights: SingleFlight[Dict[str, Any]] = SingleFlight()
+                for task in leased:
+                    payload = task["payload"]
+                    future = asyncio.ensure_future(process_lead(
+                        task["index"], payload["lead_name"], payload["company"],
+                        sender, use_dedupe, flights, pipeline,
+                    ))
+                    running[future] = task["index"]
+            if not running:
+                try:
+                    if await _queue_io(queue.drained, queue_id):
+                        return processed
+                except sqlite3.Error as e:
+                    print(f"⚠️ Could not read queue progress ({e}); trying again.")
+                # Everything left is leased by other workers; wait in case one of them dies
+                await asyncio.sleep(Config.QUEUE_POLL_INTERVAL)
+                continue
+
+            done, _ = await asyncio.wait(
+                list(running), timeout=Config.QUEUE_POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                del running[future]
+                result = future.result()
+                try:
+                    await _queue_io(
+                        queue.complete, queue_id, owner, result["index"], dict(result), Config.QUEUE_MAX_ATTEMPTS,
+                        attempts=QUEUE_WRITE_ATTEMPTS,
+                    )
+                except sqlite3.Error as e:
+                    # Not fatal: the lease expires and another worker redoes the lead
+                    print(f"⚠️ Could not store lead {result['index']} ({e}); it will be retried.")
+                    continue
+                processed += 1
+                if on_result:
+                    on_result(result)
+
+            if running and time.monotonic() - last_heartbeat > visibility / 3:
+                try:
+                    await _queue_io(queue.extend, queue_id, owner, list(running.values()), visibility)
+                    last_heartbeat = time.monotonic()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Could not renew leases ({e}); trying again.")
+    finally:
+        for future in running:
+            future.cancel()
+        if running:
+            try:
+                await _queue_io(queue.release, queue_id, owner, list(running.values()), attempts=QUEUE_WRITE_ATTEMPTS)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not release {len(running)} leases ({e}); they return after the visibility timeout.")
+        await aclose_async_client()
+
+def run_worker(
+    queue_id: str,
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[LeadResult], None]] = None,
+    dedupe: Optional[bool] = None,
+) -> int:
+    return asyncio.run(arun_worker(queue_id, concurrency, on_result, dedupe))
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+from .metrics import metrics
+from .resources import resource
+
+class DiskCache:
+    """SQLite-backed key/value store with per-entry TTL and a size cap.
+
+    Keys live in namespaces (e.g. "tavily", "scrape") so one file can serve
+    several tools. Values must be JSON-serializable. When the file grows past
+    `max_bytes`, the least recently used entries are evicted first.
+    """
+
+    def __init__(self, path: str, default_ttl: float, max_bytes: int) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, namespace TEXT NOT NULL, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+        self._bytes = self._total_bytes()
+
+    @staticmethod
+    def _key(namespace: str, raw_key: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{raw_key}".encode("utf-8")).hexdigest()
+
+    def _total_bytes(self) -> int:
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return int(row[0])
+
+    def get(self, namespace: str, raw_key: str) -> Optional[Any]:
+        key = self._key(namespace, raw_key)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                self.misses[namespace] += 1
+                metrics.inc("agent_cache_requests_total", cache=namespace, result="miss")
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits[namespace] += 1
+            metrics.inc("agent_cache_requests_total", cache=namespace, result="hit")
+        return json.loads(row[0])
+
+    def set(self, namespace: str, raw_key: str, value: Any, ttl: Optional[float] = None) -> None:
+        key = self._key(namespace, raw_key)
+        payload = json.dumps(value)
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            # Overwriting a key replaces its old size rather than adding to it
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, namespace, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, payload, len(payload), expires_at, now),
+            )
+            self._bytes += len(payload) - (int(old[0]) if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+
+    def delete(self, namespace: str, raw_key: str) -> None:
+        key = self._key(namespace, raw_key)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._bytes -= int(old[0]) if old else 0
+
+    def _evict(self, now: float) -> None:
+        # Expired rows go first, then least recently used until we fit again
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        self._bytes = self._total_bytes()
+        if self._bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        cursor = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC")
+        doomed: List[Tuple[str]] = []
+        for key, size in cursor.fetchall():
+            if self._bytes <= target:
+                break
+            doomed.append((key,))
+            self._bytes -= int(size)
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM entries")
+            else:
+                self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            self._bytes = self._total_bytes()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per namespace since this process started."""
+        namespaces = set(self.hits) | set(self.misses)
+        return {ns: {"hits": self.hits[ns], "misses": self.misses[ns]} for ns in sorted(namespaces)}
+
+@resource("disk_cache")
+def get_disk_cache() -> DiskCache:
+    return DiskCache(Config.CACHE_PATH, Config.RESEARCH_CACHE_TTL, Config.CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,58 @@
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence
+import numpy as np
+from numpy.typing import NDArray
+from langchain_core.documents import Document
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import Chroma
+
+class CaseStudyIndex:
+    """All case-study embeddings held in one contiguous, L2-normalized float32 matrix.
+
+    Cosine similarity is then a single matrix product, and a batch of queries
+    is scored in one call. At case-study library sizes (thousands of rows) this
+    is far cheaper than a Chroma round-trip per lead.
+    """
+
+    def __init__(self, documents: List[Document], embeddings: Any) -> None:
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(documents):
+            raise ValueError("embeddings must be a (n_documents, dim) matrix")
+        self.documents = documents
+        self.matrix = _normalize(matrix)
+
+    @classmethod
+    def from_vectorstore(cls, db: "Chroma") -> "CaseStudyIndex":
+        """Loads every stored embedding from Chroma in one read."""
+        data: Any = db.get(include=["embeddings", "documents", "metadatas"])
+        texts: List[Optional[str]] = data.get("documents") or []
+        metadatas: List[Any] = data.get("metadatas") or [{} for _ in texts]
+        documents = [Document(page_content=text or "", metadata=meta or {}) for text, meta in zip(texts, metadatas)]
+        embeddings = data.get("embeddings")
+        if embeddings is None or len(documents) == 0:
+            return cls([], np.zeros((0, 1), dtype=np.float32))
+        return cls(documents, embeddings)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, queries: Sequence[Sequence[float]], k: int = 1) -> List[List[Document]]:
+        """Top-k documents for each query vector, best first."""
+        if not self.documents:
+            return [[] for _ in queries]
+        q = _normalize(np.asarray(queries, dtype=np.float32))
+        scores = q @ self.matrix.T
+        k = min(k, len(self.documents))
+        if k < len(self.documents):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(len(self.documents)), (len(q), 1))
+        # argpartition leaves the top k unordered; sort just those
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        ranked = np.take_along_axis(top, order, axis=1)
+        return [[self.documents[i] for i in row] for row in ranked.tolist()]
+
+def _normalize(matrix: NDArray[np.float32]) -> NDArray[np.float32]:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
@@ -10,6 +10,116 @@ class Config:
     EMBEDDING_MODEL = "all-MiniLM-L6-v2"
     CHROMA_PATH = "./chroma_db"
 
+    # Batch execution: how many leads are processed concurrently
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    # Share research + qualification between contacts at the same company
+    DEDUPE_COMPANIES = os.getenv("DEDUPE_COMPANIES", "true").lower() == "true"
+    DEDUPE_CACHE_SIZE = int(os.getenv("DEDUPE_CACHE_SIZE", "1024"))  # finished companies kept for later contacts
+
+    # Durable runs: LangGraph checkpoints plus a manifest of finished leads
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "./.runs/checkpoints.sqlite")
+    MANIFEST_PATH = os.getenv("MANIFEST_PATH", "./.runs/manifest.sqlite")
+
+    # Streamlit campaigns run as background jobs; each gets a folder under JOBS_PATH
+    JOBS_PATH = os.getenv("JOBS_PATH", "./.runs/jobs")
+    MAX_JOBS = int(os.getenv("MAX_JOBS", "2"))  # campaigns running at once; the rest queue
+
+    # Worker mode: leads wait in a SQLite queue that any number of worker processes drain.
+    # Put QUEUE_PATH on shared storage to spread one queue over several machines.
+    QUEUE_PATH = os.getenv("QUEUE_PATH", "./.runs/queue.sqlite")
+    QUEUE_VISIBILITY_TIMEOUT = float(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "300"))  # seconds a lease lasts unrenewed
+    QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+    QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "1.0"))
+
+    # Research cache: Tavily results and scraped pages persist across runs
+    CACHE_PATH = os.getenv("CACHE_PATH", "./.cache/research.sqlite")
+    RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", str(7 * 24 * 3600)))  # seconds, 0 disables
+    CACHE_MAX_MB = int(os.getenv("CACHE_MAX_MB", "256"))
+
+    # LLM response cache for temperature-0 calls: memory | sqlite | tiered | none
+    LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "tiered")
+    LLM_CACHE_MAXSIZE = int(os.getenv("LLM_CACHE_MAXSIZE", "10000"))
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./.cache/llm.sqlite")
+
+    # Website scraping: shared keep-alive pool, streamed with a download cap
+    SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "10"))  # seconds
+    SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(512 * 1024)))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+    SCRAPE_CONNECT_TIMEOUT = float(os.getenv("SCRAPE_CONNECT_TIMEOUT", "3"))
+    DNS_TIMEOUT = float(os.getenv("DNS_TIMEOUT", "2"))
+    # Where tech_node looks for a company's website; {domain} is the lowercased, space-free name
+    COMPANY_URL_TEMPLATE = os.getenv("COMPANY_URL_TEMPLATE", "https://www.{domain}.com")
+
+    # Dead domains: remembered on disk, and failing hosts trip a circuit breaker
+    NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", str(24 * 3600)))  # seconds, 0 disables
+    BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "3"))
+    BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "60"))
+
+    # Provider rate limits (per model for Groq) and retry policy
+    GROQ_RPM = float(os.getenv("GROQ_RPM", "30"))
+    GROQ_TPM = float(os.getenv("GROQ_TPM", "6000"))
+    GROQ_CONCURRENCY = int(os.getenv("GROQ_CONCURRENCY", "4"))
+    GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "16"))
+    COMPLETION_TOKENS_ESTIMATE = int(os.getenv("COMPLETION_TOKENS_ESTIMATE", "300"))
+    TAVILY_RPM = float(os.getenv("TAVILY_RPM", "100"))
+    TAVILY_CONCURRENCY = int(os.getenv("TAVILY_CONCURRENCY", "4"))
+    TAVILY_MAX_CONCURRENCY = int(os.getenv("TAVILY_MAX_CONCURRENCY", "16"))
+    MAX_RETRIES = int(os.getenv("MAX_RETRIES", "4"))
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1"))  # seconds
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+
+    # Streaming I/O: leads are read in chunks, results appended as they finish
+    CSV_CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", "1000"))
+    OUTPUT_FORMATS = [f.strip() for f in os.getenv("OUTPUT_FORMATS", "jsonl,csv").split(",") if f.strip()]
+    PARQUET_ROW_GROUP = int(os.getenv("PARQUET_ROW_GROUP", "1000"))
+
+    # Case-study retrieval: "chroma" queries the store, "numpy" searches an
+    # in-memory copy. Both embed HyDE documents in batches across leads.
+    RETRIEVAL_ENGINE = os.getenv("RETRIEVAL_ENGINE", "chroma")
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+    EMBED_BATCH_WAIT = float(os.getenv("EMBED_BATCH_WAIT", "0.02"))  # seconds
+    # HyDE query: "generate" writes a hypothetical story first, "summary" embeds the research directly
+    HYDE_MODE = os.getenv("HYDE_MODE", "generate")
+    HYDE_MEMO_SIZE = int(os.getenv("HYDE_MEMO_SIZE", "4096"))
+    # Start case-study retrieval alongside the filter instead of after it
+    SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() == "true"
+    # Case-study ingestion (`python -m src.ingest DIR`): chunk size and chunks embedded per call
+    INGEST_CHUNK_CHARS = int(os.getenv("INGEST_CHUNK_CHARS", "1500"))
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+
+    # Research summary: ranked passages packed into a token budget (0 = join everything)
+    SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "600"))
+    SUMMARY_PASSAGE_CHARS = int(os.getenv("SUMMARY_PASSAGE_CHARS", "500"))
+    SUMMARY_DEDUP_THRESHOLD = float(os.getenv("SUMMARY_DEDUP_THRESHOLD", "0.92"))
+
+    # Pre-qualification cascade: embedding similarity of research vs. product.
+    # Off by default: the thresholds below are not calibrated, and a NO drops the
+    # lead without an LLM ever seeing it. Measure them on your own labeled leads
+    # with `python -m src.prequal labeled.csv` before turning it on.
+    PREQUAL_ENABLED = os.getenv("PREQUAL_ENABLED", "false").lower() == "true"
+    PREQUAL_YES_THRESHOLD = float(os.getenv("PREQUAL_YES_THRESHOLD", "0.55"))
+    PREQUAL_NO_THRESHOLD = float(os.getenv("PREQUAL_NO_THRESHOLD", "0.05"))
+    # Batched qualification: up to QUALIFY_BATCH_SIZE leads that reach the filter within
+    # QUALIFY_BATCH_WAIT seconds of each other share one Groq request
+    BATCH_QUALIFICATION = os.getenv("BATCH_QUALIFICATION", "false").lower() == "true"
+    QUALIFY_BATCH_SIZE = int(os.getenv("QUALIFY_BATCH_SIZE", "8"))
+    QUALIFY_BATCH_WAIT = float(os.getenv("QUALIFY_BATCH_WAIT", "0.25"))  # seconds
+    QUALIFY_BATCH_SUMMARY_TOKENS = int(os.getenv("QUALIFY_BATCH_SUMMARY_TOKENS", "200"))  # research per lead
+    QUALIFY_BATCH_WORKERS = int(os.getenv("QUALIFY_BATCH_WORKERS", "4"))  # batches in flight at once
+    QUALIFY_TIMEOUT = float(os.getenv("QUALIFY_TIMEOUT", "60"))  # seconds a call may wait for a thread before it is dropped
+
+    # Local critic: hard email rules checked before any LLM review
+    LOCAL_CRITIC = os.getenv("LOCAL_CRITIC", "true").lower() == "true"
+    MAX_EMAIL_WORDS = int(os.getenv("MAX_EMAIL_WORDS", "100"))
+    MIN_READING_EASE = float(os.getenv("MIN_READING_EASE", "30"))
+    MAX_READING_GRADE = float(os.getenv("MAX_READING_GRADE", "14"))
+
+    # Metrics: serve Prometheus text on this port during CLI runs (0 = off).
+    # Labels are node, provider, model and cache names (no lead data); still served
+    # on localhost only unless METRICS_HOST says otherwise.
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
     @classmethod
     def validate(cls):
         if not cls.TAVILY_API_KEY:
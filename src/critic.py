@@ -0,0 +1,58 @@
+import re
+from typing import Callable, List, Optional, Tuple
+
+from .config import Config
+
+PLACEHOLDER = re.compile(r"\[[^\]\n]{0,40}\]")
+SIGN_OFF_WINDOW = 200  # chars at the end of the draft that must hold the sign-off
+
+_readability_warned = False
+
+def readability(text: str) -> Optional[Tuple[float, float]]:
+    """Flesch reading ease and Flesch-Kincaid grade, or None when they can't be computed.
+
+    Recent textstat releases need NLTK's cmudict corpus and raise LookupError
+    without it; the draft is then judged on the structural rules alone.
+    """
+    global _readability_warned
+    try:
+        import textstat  # type: ignore  # slow to import; only needed once a draft exists
+        ease: Callable[[str], float] = getattr(textstat, "flesch_reading_ease")
+        grade: Callable[[str], float] = getattr(textstat, "flesch_kincaid_grade")
+        return float(ease(text)), float(grade(text))
+    except (ImportError, LookupError) as e:
+        if not _readability_warned:
+            _readability_warned = True
+            print(f"⚠️ Readability check skipped ({type(e).__name__}); install textstat and NLTK's cmudict to enable it.")
+        return None
+
+def local_critique(draft: str, sender_name: str, sender_company: str) -> List[str]:
+    """Checks the writer's hard rules on the machine.
+
+    Returns one precise, actionable line of feedback per broken rule; an
+    empty list means the draft is fit for the (LLM) style review.
+    """
+    issues: List[str] = []
+
+    words = len(draft.split())
+    if words > Config.MAX_EMAIL_WORDS:
+        issues.append(f"The email is {words} words; cut it to at most {Config.MAX_EMAIL_WORDS}.")
+
+    placeholders = sorted(set(PLACEHOLDER.findall(draft)))
+    if placeholders:
+        issues.append(f"Remove placeholder text: {', '.join(placeholders)}.")
+
+    tail = draft[-SIGN_OFF_WINDOW:].casefold()
+    if sender_name.casefold() not in tail or sender_company.casefold() not in tail:
+        issues.append(f"Sign off exactly as '{sender_name}, {sender_company}'.")
+
+    scores = readability(draft) if words else None
+    if scores is not None:
+        ease, grade = scores
+        if ease < Config.MIN_READING_EASE or grade > Config.MAX_READING_GRADE:
+            issues.append(
+                f"Too hard to read (Flesch ease {ease:.0f}, grade {grade:.0f}); "
+                "use shorter sentences and plainer words."
+            )
+
+    return issues
@@ -0,0 +1,314 @@
+import asyncio
+import codecs
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+from .cache import get_disk_cache
+from .config import Config
+from .metrics import external_call
+from .resources import resource
+
+# requests and httpx are imported when the first pool is built
+if TYPE_CHECKING:
+    import httpx
+    import requests  # type: ignore
+
+MAX_TEXT_CHARS = 2000
+CHUNK_SIZE = 16 * 1024
+USER_AGENT = "Mozilla/5.0 (compatible; AISalesAgent/1.0)"
+
+# Content inside these tags is never visible text
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+# --- HTML -> TEXT ---
+class TextCollector(HTMLParser):
+    """Incremental HTML-to-text extractor.
+
+    Feed it chunks as they arrive; it keeps whitespace-collapsed visible text
+    and reports `done` once `limit` characters are collected, so the caller
+    can stop downloading instead of parsing the whole page.
+    """
+
+    def __init__(self, limit: int = MAX_TEXT_CHARS) -> None:
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._length = 0
+        self._skip_depth = 0
+
+    @property
+    def done(self) -> bool:
+        return self._length >= self.limit
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        # A text node can arrive in pieces when it straddles two chunks, so
+        # buffer it until the next tag instead of splitting words
+        if not self._skip_depth and not self.done:
+            self._pending.append(data)
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = " ".join("".join(self._pending).split())
+        self._pending.clear()
+        if text:
+            self._parts.append(text)
+            self._length += len(text) + 1
+
+    def text(self) -> str:
+        self._flush()
+        return " ".join(self._parts)[:self.limit]
+
+def _decoder(encoding: Optional[str]) -> "codecs.IncrementalDecoder":
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+def _consume(chunks: Iterator[bytes], encoding: Optional[str]) -> str:
+    collector = TextCollector()
+    decoder = _decoder(encoding)
+    received = 0
+    for chunk in chunks:
+        received += len(chunk)
+        collector.feed(decoder.decode(chunk))
+        if collector.done or received >= Config.SCRAPE_MAX_BYTES:
+            break
+    return collector.text()
+
+async def _aconsume(chunks: AsyncIterator[bytes], encoding: Optional[str]) -> str:
+    collector = TextCollector()
+    decoder = _decoder(encoding)
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        collector.feed(decoder.decode(chunk))
+        if collector.done or received >= Config.SCRAPE_MAX_BYTES:
+            break
+    return collector.text()
+
+# --- DEAD HOST PROTECTION ---
+class HostUnavailable(Exception):
+    """Raised without a full fetch when a host is known or found to be unreachable."""
+
+class HostNotFound(HostUnavailable):
+    """The host name does not resolve at all (as opposed to a slow or flaky DNS lookup)."""
+
+class CircuitBreaker:
+    """Per-host breaker: opens after `threshold` consecutive failures.
+
+    While open, calls fail immediately. After `cooldown` seconds a single
+    probe is let through; success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(self, threshold: int, cooldown: float) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host: str) -> bool:
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at >= self.cooldown:
+                # Half-open: restart the clock so only this caller probes
+                self._opened_at[host] = time.monotonic()
+                return True
+            return False
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+
+    def record_failure(self, host: str) -> bool:
+        """Counts a failure; True when this failure opens (or re-opens) the breaker."""
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.threshold:
+                self._opened_at[host] = time.monotonic()
+                return True
+            return False
+
+_breaker = CircuitBreaker(Config.BREAKER_THRESHOLD, Config.BREAKER_COOLDOWN)
+_dns_pool = ThreadPoolExecutor(max_workers=Config.HTTP_POOL_SIZE, thread_name_prefix="dns")
+
+def _host_and_port(url: str) -> Tuple[str, int]:
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return (parts.hostname or "").lower(), port
+
+def _dead_host_reason(host: str) -> Optional[str]:
+    if Config.NEGATIVE_CACHE_TTL <= 0:
+        return None
+    reason = get_disk_cache().get("dead_host", host)
+    return None if reason is None else str(reason)
+
+def _check_host(host: str, dead_reason: Optional[str]) -> None:
+    if dead_reason is not None:
+        # Remembered as dead either because the name didn't resolve or because the breaker opened
+        error = HostNotFound if dead_reason.startswith(HostNotFound.__name__) else HostUnavailable
+        raise error(f"{host} recently unreachable ({dead_reason})")
+    if not _breaker.allow(host):
+        raise HostUnavailable(f"circuit open for {host}")
+
+def _record_failure(host: str, error: Exception) -> Optional[str]:
+    """Feeds the breaker; returns the reason to remember the host as dead, if any.
+
+    Only a name that doesn't resolve, or a breaker that just opened after
+    BREAKER_THRESHOLD consecutive failures, goes to the negative cache; a
+    single timeout, 403, 429 or 503 does not.
+    """
+    opened = _breaker.record_failure(host)
+    if Config.NEGATIVE_CACHE_TTL <= 0 or not (opened or isinstance(error, HostNotFound)):
+        return None
+    return f"{type(error).__name__}: {error}"
+
+def _remember_dead(host: str, reason: str) -> None:
+    get_disk_cache().set("dead_host", host, reason, ttl=Config.NEGATIVE_CACHE_TTL)
+
+def _dns_error(host: str, error: Exception) -> HostUnavailable:
+    if isinstance(error, socket.gaierror) and error.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", None)):
+        return HostNotFound(f"DNS lookup failed for {host}: {error}")
+    return HostUnavailable(f"DNS lookup failed for {host}: {error}")
+
+def _start_lookup(host: str, port: int, on_start: Callable[[], None]) -> "Future[Any]":
+    def lookup() -> Any:
+        on_start()
+        return socket.getaddrinfo(host, port)
+    return _dns_pool.submit(lookup)
+
+# getaddrinfo has no timeout of its own, so bound the wait from outside. The
+# clock starts once the lookup is running: time queued for a pool thread says
+# nothing about the host, and counting it would mark healthy hosts dead.
+def _resolve(host: str, port: int) -> None:
+    started = threading.Event()
+    try:
+        future = _start_lookup(host, port, started.set)
+        started.wait()
+        future.result(timeout=Config.DNS_TIMEOUT)
+    except Exception as e:
+        raise _dns_error(host, e) from e
+
+async def _aresolve(host: str, port: int) -> None:
+    # A dedicated pool, not the loop's default executor: LangGraph runs every
+    # sync node there, so a lookup could queue behind LLM calls
+    loop = asyncio.get_running_loop()
+    started = asyncio.Event()
+
+    def mark_started() -> None:
+        loop.call_soon_threadsafe(started.set)
+
+    try:
+        future = _start_lookup(host, port, mark_started)
+        await started.wait()
+        await asyncio.wait_for(asyncio.wrap_future(future), timeout=Config.DNS_TIMEOUT)
+    except Exception as e:
+        raise _dns_error(host, e) from e
+
+# --- CONNECTION POOLS ---
+@resource("http_session")
+def get_session() -> "requests.Session":
+    """Process-wide keep-alive session shared by all scraping threads."""
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_SIZE, pool_maxsize=Config.HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+# httpx clients are bound to the event loop that created them, so keep one per loop
+_async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+
+def get_async_client() -> "httpx.AsyncClient":
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+
+        limits = httpx.Limits(max_connections=Config.HTTP_POOL_SIZE, max_keepalive_connections=Config.HTTP_POOL_SIZE)
+        client = httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(Config.SCRAPE_TIMEOUT, connect=Config.SCRAPE_CONNECT_TIMEOUT),
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        )
+        _async_clients[loop] = client
+    return client
+
+async def aclose_async_client() -> None:
+    """Closes the current loop's client; call before the loop shuts down."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+# --- FETCHERS ---
+# Each fetch first checks the negative cache and the host's breaker, then does
+# a bounded DNS lookup. The short connect timeout makes unreachable hosts fail
+# in seconds without waiting for the full read timeout. Every failure counts
+# towards the breaker; the host is marked dead for NEGATIVE_CACHE_TTL only when
+# its name doesn't resolve or the breaker opens.
+def fetch_text(url: str) -> str:
+    """Streams `url` and returns up to MAX_TEXT_CHARS of visible text.
+
+    Raises on network errors and 4xx/5xx responses; HostNotFound when the
+    host name doesn't resolve.
+    """
+    host, port = _host_and_port(url)
+    _check_host(host, _dead_host_reason(host))
+    try:
+        with external_call("http", "scrape"):
+            _resolve(host, port)
+            timeout = (Config.SCRAPE_CONNECT_TIMEOUT, Config.SCRAPE_TIMEOUT)
+            with get_session().get(url, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                text = _consume(response.iter_content(CHUNK_SIZE), response.encoding)
+    except Exception as e:
+        reason = _record_failure(host, e)
+        if reason is not None:
+            _remember_dead(host, reason)
+        raise
+    _breaker.record_success(host)
+    return text
+
+async def afetch_text(url: str) -> str:
+    host, port = _host_and_port(url)
+    # The negative cache is SQLite; keep its reads and writes off the event loop
+    _check_host(host, await asyncio.to_thread(_dead_host_reason, host))
+    try:
+        with external_call("http", "scrape"):
+            await _aresolve(host, port)
+            async with get_async_client().stream("GET", url) as response:
+                response.raise_for_status()
+                text = await _aconsume(response.aiter_bytes(CHUNK_SIZE), response.charset_encoding)
+    except Exception as e:
+        reason = _record_failure(host, e)
+        if reason is not None:
+            await asyncio.to_thread(_remember_dead, host, reason)
+        raise
+    _breaker.record_success(host)
+    return text
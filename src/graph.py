@@ -1,26 +1,34 @@
-from typing import Literal
+from typing import Any, Callable, Literal, Optional, TypeAlias
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, START, END
+from langgraph.graph.state import CompiledStateGraph
 from .state import AgentState
-from .agents import news_node, tech_node, filter_node, writer_node, critic_node
-
-# --- THE GRAPH ORCHESTRATOR ---
-
-# Initialize the workflow
-workflow = StateGraph(AgentState)
+from .agents import (
+    news_node, anews_node, tech_node, atech_node, filter_node, case_study_node, writer_node, critic_node
+)
+from .config import Config
+from .metrics import instrument_node
+from .resources import resource
 
-# Define the Nodes
-workflow.add_node("news_node", news_node)
-workflow.add_node("tech_node", tech_node)
-workflow.add_node("filter_node", filter_node)
-workflow.add_node("writer_node", writer_node)
-workflow.add_node("critic_node", critic_node)
+# Type parameters: state, context (none), input and output. Quoted, since
+# older langgraph releases don't make these classes generic at runtime.
+Workflow: TypeAlias = "StateGraph[AgentState, None, AgentState, AgentState]"
+CompiledGraph: TypeAlias = "CompiledStateGraph[AgentState, None, AgentState, AgentState]"
+Checkpointer: TypeAlias = "BaseCheckpointSaver[str]"
 
-# --- THE WIRING ---
-# We sequence the research to ensure all data is gathered before filtering
-# START -> News -> Tech -> Filter
-workflow.add_edge(START, "news_node")
-workflow.add_edge("news_node", "tech_node")
-workflow.add_edge("tech_node", "filter_node")
+# --- THE GRAPH ORCHESTRATOR ---
+# The pipeline has two stages:
+#   research (company-scoped): news + tech -> filter
+#   outreach (per contact):    writer <-> critic
+# `app` wires both together for a single lead. The batch runner can also run
+# the stages separately so one company's research is shared by its contacts.
+# Every builder accepts an optional checkpointer so long batches can resume.
+# Every node is timed into the metrics registry (see src/metrics.py).
+#
+# Speculative mode (SPECULATIVE_RETRIEVAL) runs case_study_node in the same
+# step as filter_node, since both only need the research. The writer then
+# finds the case study already in state; for disqualified leads it is unused.
 
 # Conditional Logic for Filter
 def check_qualification(state: AgentState) -> Literal["writer_node", END]:
@@ -28,32 +36,98 @@ def check_qualification(state: AgentState) -> Literal["writer_node", END]:
         return "writer_node"
     return END
 
-workflow.add_conditional_edges(
-    "filter_node",
-    check_qualification,
-    {
-        "writer_node": "writer_node",
-        END: END
-    }
-)
-
-# Writer -> Critic
-workflow.add_edge("writer_node", "critic_node")
-
 # Conditional Logic for Critic
 def check_critic(state: AgentState) -> Literal["writer_node", END]:
     if state.get("is_perfect"):
         return END
     return "writer_node"
 
-workflow.add_conditional_edges(
-    "critic_node",
-    check_critic,
-    {
-        "writer_node": "writer_node",
-        END: END
-    }
-)
+def _node(name: str, func: Callable[..., Any], afunc: Optional[Callable[..., Any]] = None) -> Any:
+    """Node timed into agent_node_seconds{node=name}, with an optional async twin."""
+    if afunc is None:
+        return instrument_node(name, func)
+    return RunnableLambda(instrument_node(name, func), afunc=instrument_node(name, afunc))
+
+def _add_research_stage(workflow: Workflow, speculative: bool) -> None:
+    # Research nodes carry an async twin, used when the graph runs via ainvoke/abatch
+    workflow.add_node("news_node", _node("news_node", news_node, anews_node))
+    workflow.add_node("tech_node", _node("tech_node", tech_node, atech_node))
+    workflow.add_node("filter_node", _node("filter_node", filter_node))
+
+    # Research fans out from START and joins at the filter. Both snippet lists are
+    # merged by the operator.add reducer on research_snippets.
+    # START -> (News || Tech) -> Filter
+    workflow.add_edge(START, "news_node")
+    workflow.add_edge(START, "tech_node")
+    workflow.add_edge(["news_node", "tech_node"], "filter_node")
+
+    if speculative:
+        # (News || Tech) -> (Filter || Case Study); this branch just ends here
+        workflow.add_node("case_study_node", _node("case_study_node", case_study_node))
+        workflow.add_edge(["news_node", "tech_node"], "case_study_node")
+        workflow.add_edge("case_study_node", END)
+
+def _add_outreach_stage(workflow: Workflow) -> None:
+    workflow.add_node("writer_node", _node("writer_node", writer_node))
+    workflow.add_node("critic_node", _node("critic_node", critic_node))
+
+    # Writer -> Critic, looping back to the Writer until the draft passes
+    workflow.add_edge("writer_node", "critic_node")
+    workflow.add_conditional_edges(
+        "critic_node",
+        check_critic,
+        {
+            "writer_node": "writer_node",
+            END: END
+        }
+    )
+
+def build_app(checkpointer: Optional[Checkpointer] = None, speculative: Optional[bool] = None) -> CompiledGraph:
+    """Full single-lead pipeline: research, qualification and outreach."""
+    workflow: Workflow = StateGraph(AgentState)
+    _add_research_stage(workflow, Config.SPECULATIVE_RETRIEVAL if speculative is None else speculative)
+    _add_outreach_stage(workflow)
+    workflow.add_conditional_edges(
+        "filter_node",
+        check_qualification,
+        {
+            "writer_node": "writer_node",
+            END: END
+        }
+    )
+    return workflow.compile(checkpointer=checkpointer)
+
+def build_research_app(checkpointer: Optional[Checkpointer] = None, speculative: Optional[bool] = None) -> CompiledGraph:
+    """Company-scoped stage only: research and qualification."""
+    workflow: Workflow = StateGraph(AgentState)
+    _add_research_stage(workflow, Config.SPECULATIVE_RETRIEVAL if speculative is None else speculative)
+    workflow.add_edge("filter_node", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+def build_outreach_app(checkpointer: Optional[Checkpointer] = None) -> CompiledGraph:
+    """Per-contact stage only: expects research_summary to already be in state."""
+    workflow: Workflow = StateGraph(AgentState)
+    _add_outreach_stage(workflow)
+    workflow.add_edge(START, "writer_node")
+    return workflow.compile(checkpointer=checkpointer)
+
+# Compiled Graphs: built once, on first use or by warm_up
+@resource("app")
+def get_app() -> CompiledGraph:
+    return build_app()
+
+@resource("research_app")
+def get_research_app() -> CompiledGraph:
+    return build_research_app()
+
+@resource("outreach_app")
+def get_outreach_app() -> CompiledGraph:
+    return build_outreach_app()
+
+_COMPILED = {"app": get_app, "research_app": get_research_app, "outreach_app": get_outreach_app}
 
-# Compile the Graph
-app = workflow.compile()
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    # Keeps `from src.graph import app` working without compiling at import time
+    if name in _COMPILED:
+        return _COMPILED[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
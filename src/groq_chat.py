@@ -0,0 +1,57 @@
+from typing import Any, List, Optional
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_groq import ChatGroq
+
+from .config import Config
+from .metrics import metrics
+from .ratelimit import estimate_tokens, get_scheduler
+
+# Kept apart from src/llm.py so langchain_groq (and the groq SDK) is only
+# imported when the first Groq client is built.
+
+class ScheduledChatGroq(ChatGroq):
+    """ChatGroq whose API calls go through the shared Groq scheduler.
+
+    Cache hits never reach `_generate`, so they cost no rate-limit budget.
+    """
+
+    def _estimate_tokens(self, messages: List[BaseMessage]) -> int:
+        prompt = sum(estimate_tokens(str(m.content)) for m in messages)
+        return prompt + (self.max_tokens or Config.COMPLETION_TOKENS_ESTIMATE)
+
+    def _record_usage(self, result: ChatResult) -> ChatResult:
+        usage = (result.llm_output or {}).get("token_usage") or {}
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage.get(kind):
+                metrics.inc("agent_llm_tokens_total", usage[kind], model=self.model_name, kind=kind[:-len("_tokens")])
+        return result
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        scheduler = get_scheduler("groq", self.model_name)
+        parent = super(ScheduledChatGroq, self)
+        return self._record_usage(scheduler.call(
+            lambda: parent._generate(messages, stop, run_manager, **kwargs),
+            self._estimate_tokens(messages),
+        ))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        scheduler = get_scheduler("groq", self.model_name)
+        parent = super(ScheduledChatGroq, self)
+        return self._record_usage(await scheduler.acall(
+            lambda: parent._agenerate(messages, stop, run_manager, **kwargs),
+            self._estimate_tokens(messages),
+        ))
@@ -0,0 +1,153 @@
+import argparse
+import csv
+import hashlib
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TypedDict
+
+from .config import Config
+from .rag import get_case_index, get_vectorstore
+
+SUFFIXES = (".md", ".markdown", ".txt", ".csv")
+# CSV columns holding the case study itself; any other columns become its header lines
+TEXT_COLUMNS = ("text", "content", "case_study", "body")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+
+class IngestReport(TypedDict):
+    sources: int
+    chunks: int
+    added: int
+    unchanged: int
+    pruned: int
+
+# --- CHUNKING ---
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """Packs whole paragraphs into chunks of at most max_chars; longer paragraphs are cut on word boundaries."""
+    chunks: List[str] = []
+    current = ""
+    for paragraph in _PARAGRAPH.split(text):
+        paragraph = paragraph.strip()
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if not paragraph:
+            continue
+        if current and len(current) + 2 + len(paragraph) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _csv_documents(path: str) -> Iterator[str]:
+    """One case study per row."""
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            values = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            column = next((c for c in values if c.casefold() in TEXT_COLUMNS), None)
+            header = "\n".join(f"{k}: {v}" for k, v in values.items() if k != column and v)
+            body = values.get(column, "") if column else ""
+            text = f"{header}\n\n{body}".strip()
+            if text:
+                yield text
+
+def _documents(path: str) -> Iterator[str]:
+    if path.lower().endswith(".csv"):
+        yield from _csv_documents(path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield f.read()
+
+def library_name(directory: str) -> str:
+    """Default library name: the folder's own name, so it survives moves and other checkouts."""
+    return os.path.basename(os.path.normpath(os.path.abspath(directory)))
+
+def chunk_id(library: str, source: str, text: str) -> str:
+    """Content address of a chunk; unchanged chunks keep their id across runs."""
+    return hashlib.sha256(f"{library}\0{source}\0{text}".encode("utf-8")).hexdigest()
+
+def scan(directory: str, max_chars: int, library: str) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """Every chunk under `directory`, as id -> (text, metadata)."""
+    root_dir = os.path.abspath(directory)
+    chunks: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for root, _, files in os.walk(root_dir):
+        for name in sorted(files):
+            if not name.lower().endswith(SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            # Forward slashes, so the same library ingested on Windows gets the same ids
+            source = os.path.relpath(path, root_dir).replace(os.sep, "/")
+            for doc_no, document in enumerate(_documents(path)):
+                for chunk_no, text in enumerate(chunk_text(document, max_chars)):
+                    metadata = {"library": library, "source": source, "document": doc_no, "chunk": chunk_no}
+                    chunks[chunk_id(library, source, text)] = (text, metadata)
+    return chunks
+
+# --- SYNC ---
+def ingest(
+    directory: str,
+    batch_size: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    library: Optional[str] = None,
+) -> IngestReport:
+    """Brings the case-study store in line with `directory`.
+
+    Chunks belong to a named `library` (default: the folder name), not to a
+    filesystem path, so moving the folder or ingesting it from another
+    checkout keeps the same ids. Only chunks whose hash is not stored yet are
+    embedded, in batches of `batch_size`; chunks of this library from edited
+    or deleted files are removed. Re-running on an unchanged library embeds nothing.
+    """
+    batch_size = batch_size or Config.INGEST_BATCH_SIZE
+    library = library or library_name(directory)
+    wanted = scan(directory, max_chars or Config.INGEST_CHUNK_CHARS, library)
+    db = get_vectorstore()
+
+    # Ids and metadata only; embeddings stay on disk
+    stored: Any = db.get(include=["metadatas"])
+    stored_ids: List[str] = stored.get("ids") or []
+    metadatas: List[Any] = stored.get("metadatas") or [None] * len(stored_ids)
+    ours = {i for i, meta in zip(stored_ids, metadatas) if (meta or {}).get("library") == library}
+    known = set(stored_ids)
+    new_ids = [i for i in wanted if i not in known]
+    stale = sorted(ours - wanted.keys())
+
+    for start in range(0, len(new_ids), batch_size):
+        ids = new_ids[start:start + batch_size]
+        # One embed_documents call per batch; Chroma upserts by id
+        db.add_texts([wanted[i][0] for i in ids], metadatas=[wanted[i][1] for i in ids], ids=ids)
+        print(f"🧩 Embedded {min(start + batch_size, len(new_ids))}/{len(new_ids)} new chunks")
+    for start in range(0, len(stale), batch_size):
+        db.delete(ids=stale[start:start + batch_size])
+
+    if new_ids or stale:
+        get_case_index.cache_clear()  # The numpy index reloads from the updated store
+    return {
+        "sources": len({meta["source"] for _, meta in wanted.values()}),
+        "chunks": len(wanted),
+        "added": len(new_ids),
+        "unchanged": len(wanted) - len(new_ids),
+        "pruned": len(stale),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or refresh the case-study store from a directory")
+    parser.add_argument("directory", help="Folder of .md, .txt or .csv case studies (searched recursively)")
+    parser.add_argument("--batch-size", type=int, default=Config.INGEST_BATCH_SIZE, help="Chunks embedded per call")
+    parser.add_argument("--chunk-chars", type=int, default=Config.INGEST_CHUNK_CHARS, help="Maximum chunk size")
+    parser.add_argument("--library", default=None,
+                        help="Name this library is stored under (default: the folder name); "
+                             "re-ingesting under the same name replaces its chunks")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        raise SystemExit(f"❌ ERROR: {args.directory} is not a directory.")
+    report = ingest(args.directory, args.batch_size, args.chunk_chars, args.library)
+    print(f"📚 {report['sources']} sources, {report['chunks']} chunks in {Config.CHROMA_PATH}: "
+          f"{report['added']} added, {report['unchanged']} unchanged, {report['pruned']} pruned")
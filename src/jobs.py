@@ -0,0 +1,153 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Dict, Hashable, List, Optional, TypedDict
+
+import pandas as pd
+
+from .batch import LeadResult, Sender, run_to_sink
+from .config import Config
+from .resources import resource
+from .streams import ResultSink, iter_leads
+
+class JobCancelled(Exception):
+    pass
+
+class JobStatus(TypedDict):
+    job_id: str
+    state: str  # queued | running | done | failed | cancelled
+    total: int
+    completed: int
+    qualified: int
+    failed: int
+    last_lead: str
+    error: Optional[str]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    results_path: str
+
+class _Job:
+    def __init__(self, job_id: str, total: int, results_path: str) -> None:
+        self.lock = threading.Lock()
+        self.cancel_requested = threading.Event()
+        self.status: JobStatus = {
+            "job_id": job_id, "state": "queued", "total": total,
+            "completed": 0, "qualified": 0, "failed": 0, "last_lead": "",
+            "error": None, "created_at": time.time(), "started_at": None, "finished_at": None,
+            "results_path": results_path,
+        }
+
+    def update(self, **fields: Any) -> None:
+        with self.lock:
+            self.status.update(fields)  # type: ignore[typeddict-item]
+
+    def snapshot(self) -> JobStatus:
+        with self.lock:
+            return JobStatus(**self.status)
+
+class JobManager:
+    """Runs campaigns on a worker pool, independent of any Streamlit session.
+
+    Each job gets an id, its own copy of the leads file and a results CSV
+    under JOBS_PATH/<job id>/. Workers append results in input order and keep
+    a progress record up to date; the UI only ever polls `status` and reads
+    pages of the results file, so a rerun, a second tab or a browser refresh
+    just reattaches to the running job.
+    """
+
+    def __init__(self, root: str = Config.JOBS_PATH, max_workers: int = Config.MAX_JOBS) -> None:
+        self.root = root
+        self._jobs: Dict[str, _Job] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="campaign")
+
+    def submit(
+        self,
+        leads: IO[bytes],
+        name_col: str,
+        company_col: str,
+        sender: Sender,
+        concurrency: int,
+        total: int,
+    ) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = os.path.join(self.root, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        # The upload belongs to the browser session; the job needs its own copy
+        leads_path = os.path.join(job_dir, "leads.csv")
+        with open(leads_path, "wb") as f:
+            shutil.copyfileobj(leads, f)
+
+        job = _Job(job_id, total, os.path.join(job_dir, "results.csv"))
+        with self._lock:
+            self._jobs[job_id] = job
+        self._pool.submit(self._run, job, leads_path, name_col, company_col, sender, concurrency)
+        return job_id
+
+    def _run(
+        self, job: _Job, leads_path: str, name_col: str, company_col: str, sender: Sender, concurrency: int
+    ) -> None:
+        if job.cancel_requested.is_set():
+            job.update(state="cancelled", finished_at=time.time())
+            return
+        job.update(state="running", started_at=time.time())
+
+        def on_result(result: LeadResult) -> None:
+            is_qual = bool(result["output"].get("is_qualified"))
+            with job.lock:
+                job.status["completed"] += 1
+                job.status["qualified"] += int(is_qual and not result["error"])
+                job.status["failed"] += int(bool(result["error"]))
+                job.status["last_lead"] = f"{result['lead_name']} @ {result['company']}"
+            if job.cancel_requested.is_set():
+                raise JobCancelled()  # Unwinds the batch, which cancels the leads in flight
+
+        prefix = job.status["results_path"][: -len(".csv")]
+        try:
+            with ResultSink(prefix, formats=["csv"]) as sink:
+                run_to_sink(iter_leads(leads_path, name_col, company_col), sender, sink, concurrency, on_result)
+            job.update(state="done", finished_at=time.time())
+        except JobCancelled:
+            job.update(state="cancelled", finished_at=time.time())
+        except Exception as e:
+            job.update(state="failed", error=f"{type(e).__name__}: {e}", finished_at=time.time())
+
+    def status(self, job_id: str) -> Optional[JobStatus]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def jobs(self) -> List[JobStatus]:
+        """Every job of this process, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted((j.snapshot() for j in jobs), key=lambda s: s["created_at"], reverse=True)
+
+    def cancel(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel_requested.set()
+
+    def read_results(self, job_id: str, offset: int, limit: int) -> pd.DataFrame:
+        """One page of a job's results, in input order; readable while the job runs."""
+        status = self.status(job_id)
+        if status is None or not os.path.exists(status["results_path"]):
+            return pd.DataFrame()
+
+        def skip(row: Hashable) -> bool:
+            return isinstance(row, int) and 0 < row <= offset  # Keep the header (row 0)
+
+        return pd.read_csv(
+            status["results_path"], skiprows=skip, nrows=limit,
+            dtype=str, keep_default_na=False,
+        )
+
+@resource("job_manager", warm=False)
+def get_job_manager() -> JobManager:
+    """The process-wide job manager, shared by every Streamlit session."""
+    return JobManager()
@@ -0,0 +1,140 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Optional, Sequence, Tuple
+from langchain_core.caches import BaseCache
+from langchain_core.language_models import BaseChatModel
+from langchain_core.outputs import Generation
+
+from .config import Config
+from .metrics import metrics
+from .resources import resource
+
+class LRUCache(BaseCache):
+    """Thread-safe in-memory LLM cache that evicts the least recently used entry.
+
+    LangChain's InMemoryCache evicts the oldest insertion instead, which
+    drops hot prompts (the shared filter and critic instructions) first.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Tuple[str, str], Sequence[Generation]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        with self._lock:
+            hit = self._items.get((prompt, llm_string))
+            if hit is not None:
+                self._items.move_to_end((prompt, llm_string))
+            return hit
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        with self._lock:
+            self._items[(prompt, llm_string)] = return_val
+            self._items.move_to_end((prompt, llm_string))
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._items.clear()
+
+class TieredCache(BaseCache):
+    """In-memory LRU in front of a persistent cache; hits are promoted to memory."""
+
+    def __init__(self, front: BaseCache, back: BaseCache) -> None:
+        self.front = front
+        self.back = back
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        hit = self.front.lookup(prompt, llm_string)
+        if hit is None:
+            hit = self.back.lookup(prompt, llm_string)
+            if hit is not None:
+                self.front.update(prompt, llm_string, hit)
+        return hit
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        self.front.update(prompt, llm_string, return_val)
+        self.back.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.front.clear(**kwargs)
+        self.back.clear(**kwargs)
+
+class CountingCache(BaseCache):
+    """Pass-through cache that records hits and misses in the metrics registry."""
+
+    def __init__(self, inner: BaseCache) -> None:
+        self.inner = inner
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        hit = self.inner.lookup(prompt, llm_string)
+        metrics.inc("agent_cache_requests_total", cache="llm", result="miss" if hit is None else "hit")
+        return hit
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        self.inner.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.inner.clear(**kwargs)
+
+@resource("llm_cache")
+def get_llm_cache() -> Optional[BaseCache]:
+    """Builds the response cache selected by LLM_CACHE_BACKEND (memory, sqlite, tiered or none)."""
+    cache = _build_llm_cache(Config.LLM_CACHE_BACKEND)
+    return CountingCache(cache) if cache is not None else None
+
+def _build_llm_cache(backend: str) -> Optional[BaseCache]:
+    if backend == "none":
+        return None
+
+    memory = LRUCache(Config.LLM_CACHE_MAXSIZE)
+    if backend == "memory":
+        return memory
+
+    from langchain_community.cache import SQLiteCache
+    os.makedirs(os.path.dirname(Config.LLM_CACHE_PATH) or ".", exist_ok=True)
+    persistent = SQLiteCache(database_path=Config.LLM_CACHE_PATH)
+    if backend == "sqlite":
+        return persistent
+    if backend == "tiered":
+        return TieredCache(memory, persistent)
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND: {backend}")
+
+# Replaces Groq everywhere (offline benchmarks); takes (temperature, model)
+_llm_factory: Optional[Callable[[float, Optional[str]], BaseChatModel]] = None
+
+def set_llm_factory(factory: Optional[Callable[[float, Optional[str]], BaseChatModel]]) -> None:
+    global _llm_factory
+    _llm_factory = factory
+
+def get_llm(temp: float = 0.0, model: Optional[str] = None) -> BaseChatModel:
+    if _llm_factory is not None:
+        return _llm_factory(temp, model)
+    return _groq_client(temp, model or Config.LLM_MODEL)
+
+@lru_cache(maxsize=None)
+def _groq_client(temp: float, model: str) -> BaseChatModel:
+    """One client per (temperature, model), reused so its HTTP pool stays warm."""
+    from .groq_chat import ScheduledChatGroq
+
+    # Retries are owned by the scheduler (jittered, rate-limit aware), so the
+    # Groq SDK's own retry loop is switched off.
+    # Only deterministic calls are cached. LangChain keys entries on the rendered
+    # prompt plus the model params (model name, temperature), so a cached reply
+    # is exactly what Groq would have returned at temperature 0.
+    cache = get_llm_cache() if temp == 0.0 else None
+    return ScheduledChatGroq(
+        model=model,
+        temperature=temp,
+        cache=cache if cache is not None else False,
+        max_retries=0,
+    )
+
+@resource("llm_clients")
+def get_default_llms() -> Tuple[BaseChatModel, ...]:
+    """The filter/critic (0.0) and writer (0.7) clients; the HyDE one is built by get_hyde_retriever."""
+    return (get_llm(0.0), get_llm(0.7))
@@ -0,0 +1,73 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Set
+
+from .config import Config
+
+class RunManifest:
+    """Durable record of batch runs and of which leads each run has finished.
+
+    A run stores its leads file and sender so `--resume` can rebuild the exact
+    batch. Each finished lead stores its final result; failed leads are kept
+    with their error so a resume retries them.
+    """
+
+    def __init__(self, path: str = Config.MANIFEST_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " run_id TEXT PRIMARY KEY, leads_path TEXT NOT NULL, sender TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leads ("
+            " run_id TEXT NOT NULL, idx INTEGER NOT NULL, status TEXT NOT NULL,"
+            " result TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (run_id, idx))"
+        )
+
+    def create_run(self, leads_path: str, sender: Dict[str, str]) -> str:
+        run_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, leads_path, sender, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, leads_path, json.dumps(sender), time.time()),
+            )
+        return run_id
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT leads_path, sender FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"run_id": run_id, "leads_path": row[0], "sender": json.loads(row[1])}
+
+    def record(self, run_id: str, index: int, result: Dict[str, Any]) -> None:
+        status = "failed" if result.get("error") else "done"
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO leads (run_id, idx, status, result, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, index, status, json.dumps(result), time.time()),
+            )
+
+    def finished(self, run_id: str) -> Set[int]:
+        """Input indices of every lead this run completed successfully."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx FROM leads WHERE run_id = ? AND status = 'done'", (run_id,)
+            ).fetchall()
+        return {int(row[0]) for row in rows}
+
+    def counts(self, run_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM leads WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        return {str(status): int(count) for status, count in rows}
@@ -0,0 +1,199 @@
+import functools
+import inspect
+import json
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Prometheus histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RESERVOIR_SIZE = 4096  # uniform sample of the whole run kept per series for p50/p95/p99
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class _Histogram:
+    def __init__(self) -> None:
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.samples: List[float] = []
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        # Reservoir sampling (Algorithm R): every observation so far is equally
+        # likely to be kept, so percentiles describe the whole run, not its tail
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(value)
+        else:
+            slot = random.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+class MetricsRegistry:
+    """Process-wide latency histograms and counters.
+
+    Series are identified by a metric name plus labels, e.g.
+    ("agent_node_seconds", {"node": "filter_node"}). Everything is exported
+    as Prometheus text or as a JSON report with p50/p95/p99.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(_key(labels))
+            if histogram is None:
+                histogram = series[_key(labels)] = _Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        self._add(name, value, labels)
+
+    def _add(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[_key(labels)] = series.get(_key(labels), 0.0) + value
+
+    @contextmanager
+    def timer(self, name: str, errors: Optional[str] = None, **labels: str) -> Generator[None, None, None]:
+        """Observes the block's duration; on exception also bumps the `errors` counter."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if errors:
+                self._add(errors, 1.0, labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # --- EXPORT ---
+    def report(self) -> Dict[str, Any]:
+        """JSON-friendly snapshot: latency percentiles and counter totals."""
+        with self._lock:
+            latencies: List[Dict[str, Any]] = []
+            for name, series in sorted(self._histograms.items()):
+                for labels, h in sorted(series.items()):
+                    latencies.append({
+                        "metric": name, **dict(labels), "count": h.count,
+                        "mean": h.total / h.count if h.count else 0.0,
+                        "p50": h.quantile(0.50), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                    })
+            counters = [
+                {"metric": name, **dict(labels), "value": value}
+                for name, series in sorted(self._counters.items())
+                for labels, value in sorted(series.items())
+            ]
+        return {"generated_at": time.time(), "latencies": latencies, "counters": counters}
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, h in sorted(series.items()):
+                    for bound, count in zip(BUCKETS, h.buckets):
+                        lines.append(f"{name}_bucket{_fmt(labels, le=str(bound))} {count}")
+                    lines.append(f"{name}_bucket{_fmt(labels, le='+Inf')} {h.count}")
+                    lines.append(f"{name}_sum{_fmt(labels)} {h.total}")
+                    lines.append(f"{name}_count{_fmt(labels)} {h.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_fmt(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_prometheus(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+
+def _fmt(labels: LabelKey, **extra: str) -> str:
+    pairs = list(labels) + sorted(extra.items())
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+metrics = MetricsRegistry()
+
+# --- HELPERS ---
+def instrument_node(name: str, fn: F) -> F:
+    """Wraps a graph node (sync or async) with latency and error tracking."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with metrics.timer("agent_node_seconds", errors="agent_node_errors_total", node=name):
+                return await fn(*args, **kwargs)
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with metrics.timer("agent_node_seconds", errors="agent_node_errors_total", node=name):
+            return fn(*args, **kwargs)
+    return wrapper  # type: ignore[return-value]
+
+def external_call(provider: str, op: str):
+    """Timer for one call to an outside service (Groq, Tavily, HTTP, embeddings)."""
+    return metrics.timer("agent_external_seconds", errors="agent_external_errors_total", provider=provider, op=op)
+
+def serve_prometheus(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves GET /metrics in a daemon thread.
+
+    Localhost only by default, since anyone who can reach it sees the run's
+    volumes and models. Pass host="0.0.0.0" to let a Prometheus server on
+    another machine scrape it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            return
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
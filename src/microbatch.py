@@ -0,0 +1,115 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Generic, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from .metrics import metrics
+
+I = TypeVar("I")
+O = TypeVar("O")
+
+class MicroBatcher(Generic[I, O]):
+    """Coalesces concurrent single-item calls into one batched call.
+
+    Callers on any thread (or event loop) submit one item and wait on a future.
+    A background worker collects up to `max_batch` items, waiting at most
+    `max_wait` seconds after the first one arrives, then runs `fn` once on the
+    whole batch. `fn` must return one output per input, in order; an output
+    that is an exception fails only that item's caller.
+
+    With `workers` > 1, up to that many batches run at once. While other
+    workers are still free a batch takes only what is already queued and
+    goes; the `max_wait` pause applies to the last free worker, so batches
+    grow under load instead of adding latency when there is none.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[I]], Sequence[Union[O, BaseException]]],
+        max_batch: int,
+        max_wait: float,
+        name: str,
+        workers: int = 1,
+    ) -> None:
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.name = name
+        self.workers = max(1, workers)
+        self.batches = 0
+        self.items = 0
+        self._queue: "queue.Queue[Tuple[I, Future[O]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._busy = 0
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                if self.workers > 1:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-batch")
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, item: I) -> "Future[O]":
+        self._ensure_worker()
+        future: Future[O] = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: I) -> O:
+        return self.submit(item).result()
+
+    async def acall(self, item: I) -> O:
+        return await asyncio.wrap_future(self.submit(item))
+
+    def _run(self) -> None:
+        while True:
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            with self._lock:
+                self._busy += 1
+                spare = self._busy < self.workers
+            deadline = time.monotonic() + (0.0 if spare else self.max_wait)
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        batch.append(self._queue.get_nowait())
+                    else:
+                        batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self.batches += 1
+            self.items += len(batch)
+            metrics.inc("agent_microbatch_batches_total", batcher=self.name)
+            metrics.inc("agent_microbatch_items_total", len(batch), batcher=self.name)
+            if self._pool is None:
+                self._run_batch(batch)
+            else:
+                self._pool.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[I, "Future[O]"]]) -> None:
+        try:
+            with metrics.timer("agent_microbatch_seconds", batcher=self.name):
+                outputs = self.fn([item for item, _ in batch])
+            if len(outputs) != len(batch):
+                raise ValueError(f"{self.name}: expected {len(batch)} outputs, got {len(outputs)}")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            with self._lock:
+                self._busy -= 1
+            self._slots.release()
+        for (_, future), output in zip(batch, outputs):
+            if isinstance(output, BaseException):
+                future.set_exception(output)
+            else:
+                future.set_result(output)
@@ -0,0 +1,110 @@
+import argparse
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, TypedDict
+import numpy as np
+
+from .config import Config
+from .rag import get_embeddings
+from .tools import SCRAPE_FAILED, SITE_NOT_FOUND
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+class PrequalDecision(TypedDict):
+    is_qualified: bool
+    reason: str
+    score: float
+
+@lru_cache(maxsize=64)
+def _product_vector(product: str) -> Tuple[float, ...]:
+    return tuple(get_embeddings().embed_query(product))
+
+def relevance_score(snippets: List[str], product: str) -> float:
+    """Best cosine similarity between the sender product and any research snippet."""
+    if not snippets:
+        return 0.0
+    product_vec = np.asarray(_product_vector(product), dtype=np.float32)
+    snippet_vecs = np.asarray(get_embeddings().embed_documents(snippets), dtype=np.float32)
+    norms = np.linalg.norm(snippet_vecs, axis=1) * (np.linalg.norm(product_vec) or 1.0)
+    norms[norms == 0] = 1.0
+    return float((snippet_vecs @ product_vec / norms).max())
+
+def prequalify(
+    snippets: List[str],
+    product: str,
+    yes_threshold: Optional[float] = None,
+    no_threshold: Optional[float] = None,
+) -> Optional[PrequalDecision]:
+    """Resolves clear-cut leads locally; returns None when the LLM should decide.
+
+    Rule signal: no news at all and a website whose name doesn't resolve
+    means the company most likely doesn't exist -> NO. (Search errors never
+    get here; news_node raises them so the lead is retried.) Any other
+    failed scrape with no news is left to the LLM. With research, it is
+    scored against the sender product with the local embedding model:
+    very similar -> YES, essentially unrelated -> NO.
+    """
+    yes_at = Config.PREQUAL_YES_THRESHOLD if yes_threshold is None else yes_threshold
+    no_at = Config.PREQUAL_NO_THRESHOLD if no_threshold is None else no_threshold
+
+    useful = [s for s in snippets if s.strip() and not s.startswith(SCRAPE_FAILED)]
+    if not useful:
+        if not any(s.startswith(SITE_NOT_FOUND) for s in snippets):
+            return None  # Timeouts, 403s and 5xx say nothing about the company
+        return {
+            "is_qualified": False,
+            "reason": "No news results and the website's domain does not exist.",
+            "score": 0.0,
+        }
+
+    score = relevance_score(useful, product)
+    if score >= yes_at:
+        return {"is_qualified": True, "reason": f"Research closely matches the product (similarity {score:.2f}).", "score": score}
+    if score <= no_at:
+        return {"is_qualified": False, "reason": f"Research is unrelated to the product (similarity {score:.2f}).", "score": score}
+    return None
+
+# --- CALIBRATION ---
+def evaluate(samples: "pd.DataFrame", yes_threshold: float, no_threshold: float) -> Dict[str, Any]:
+    """Measures the cascade against labeled decisions.
+
+    `samples` needs `product`, `research_summary` (one snippet per line) and
+    `label` (YES/NO, e.g. the LLM filter's verdicts). Reports how many leads
+    the cascade resolves locally and how often it agrees with the label.
+    """
+    resolved = agreed = false_yes = false_no = 0
+    for row in samples.itertuples(index=False):
+        snippets = [line for line in str(getattr(row, "research_summary")).splitlines() if line.strip()]
+        decision = prequalify(snippets, str(getattr(row, "product")), yes_threshold, no_threshold)
+        if decision is None:
+            continue
+        resolved += 1
+        expected = str(getattr(row, "label")).strip().upper().startswith("YES")
+        if decision["is_qualified"] == expected:
+            agreed += 1
+        elif decision["is_qualified"]:
+            false_yes += 1
+        else:
+            false_no += 1
+    total = len(samples)
+    return {
+        "samples": total,
+        "resolved_locally": resolved,
+        "coverage": resolved / total if total else 0.0,
+        "agreement": agreed / resolved if resolved else 0.0,
+        "false_yes": false_yes,
+        "false_no": false_no,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure pre-qualification agreement on a labeled CSV")
+    parser.add_argument("samples", help="CSV with product, research_summary and label (YES/NO) columns")
+    parser.add_argument("--yes", type=float, default=Config.PREQUAL_YES_THRESHOLD, help="YES similarity threshold")
+    parser.add_argument("--no", type=float, default=Config.PREQUAL_NO_THRESHOLD, help="NO similarity threshold")
+    args = parser.parse_args()
+
+    import pandas as pd
+    report = evaluate(pd.read_csv(args.samples, dtype=str, keep_default_na=False), args.yes, args.no)
+    print(f"📊 {report['resolved_locally']}/{report['samples']} resolved locally ({report['coverage']:.1%} coverage)")
+    print(f"🎯 Agreement with labels: {report['agreement']:.1%} "
+          f"(false YES: {report['false_yes']}, false NO: {report['false_no']})")
@@ -0,0 +1,166 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Literal, TypedDict, Union
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, ValidationError
+
+from .config import Config
+from .llm import get_llm
+from .metrics import metrics
+from .microbatch import MicroBatcher
+from .ratelimit import estimate_tokens
+from .resources import resource
+
+class QualifyRequest(TypedDict):
+    company: str
+    product: str
+    summary: str
+
+class Verdict(TypedDict):
+    is_qualified: bool
+    reason: str
+
+# Same rules in both modes, so batching never changes who qualifies
+RULES = (
+    "CRITICAL RULES:\n"
+    "1. Answer 'YES' if the company is in a relevant industry or fits the product context.\n"
+    "2. Answer 'NO' ONLY if the company doesn't exist, is out of business, or is completely irrelevant.\n"
+)
+
+# --- SINGLE LEAD ---
+def qualify_one(request: QualifyRequest) -> Verdict:
+    # We use a simple string check first to avoid JSON parsing drama
+    # STRICT PROMPT: We want deterministic YES/NO.
+    prompt = ChatPromptTemplate.from_template(
+        "Based on this research: {summary}\n\n"
+        "Should we reach out to {company} regarding {product}?\n"
+        + RULES +
+        "3. Answer with 'YES' or 'NO' first, then a short reason."
+    )
+
+    # Get raw text response
+    # Reduce temperature to 0.0 for deterministic results
+    raw_res = (prompt | get_llm(0.0) | StrOutputParser()).invoke(dict(request))
+
+    # Simple Logic: If it says 'NO' (case insensitive), we disqualify.
+    # Otherwise, we go for it!
+    return {"is_qualified": not raw_res.strip().upper().startswith("NO"), "reason": raw_res}
+
+# --- BATCHED ---
+class _LeadVerdict(BaseModel):
+    id: int
+    answer: Literal["YES", "NO"]
+    reason: str
+
+class _BatchVerdicts(BaseModel):
+    verdicts: List[_LeadVerdict]
+
+def compact_summary(summary: str, tokens: int) -> str:
+    """The first (most relevant) lines of a research summary that fit in `tokens`."""
+    kept: List[str] = []
+    used = 0
+    for line in summary.splitlines():
+        cost = estimate_tokens(line)
+        if used + cost > tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept) or summary[: tokens * 4]
+
+def _ask_batch(product: str, requests: List[QualifyRequest]) -> Dict[int, Verdict]:
+    """One LLM call for several companies; returns the verdicts that came back well-formed."""
+    prompt = ChatPromptTemplate.from_template(
+        "You qualify sales leads for {product}. Decide for each company below whether we should reach out.\n"
+        + RULES +
+        "3. Return only JSON, exactly one verdict per company: "
+        '{{"verdicts": [{{"id": <company id>, "answer": "YES" or "NO", "reason": "<short reason>"}}]}}\n\n'
+        "{leads}"
+    )
+    leads = "\n\n".join(
+        f"[{i}] Company: {r['company']}\nResearch: {compact_summary(r['summary'], Config.QUALIFY_BATCH_SUMMARY_TOKENS)}"
+        for i, r in enumerate(requests)
+    )
+    raw_res = (prompt | get_llm(0.0) | StrOutputParser()).invoke({"product": product, "leads": leads})
+    try:
+        parsed: Any = JsonOutputParser().parse(raw_res)
+        verdicts = _BatchVerdicts.model_validate(parsed).verdicts
+    except (OutputParserException, ValidationError) as e:
+        print(f"⚠️ Batched qualification returned malformed output, falling back per lead: {e}")
+        return {}
+    found: Dict[int, Verdict] = {}
+    for v in verdicts:
+        if 0 <= v.id < len(requests) and v.id not in found:
+            found[v.id] = {"is_qualified": v.answer == "YES", "reason": f"{v.answer} (batched): {v.reason}"}
+    return found
+
+# Batched calls for different products, and the per-lead fallbacks, run side by side
+@resource("qualify_pool", warm=False)
+def _get_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=Config.GROQ_MAX_CONCURRENCY, thread_name_prefix="qualify")
+
+def _run_all(calls: List[Callable[[], Any]]) -> List[Union[Any, BaseException]]:
+    """Runs `calls` concurrently; each slot holds a result or the exception it raised.
+
+    A call still queued for a thread after QUALIFY_TIMEOUT seconds is dropped
+    with a TimeoutError. One already running is waited for: a thread can't be
+    stopped, and asking again alongside it would pay for the same answer
+    twice (the Groq client's own request timeout bounds it).
+    """
+    futures: List[Future[Any]] = [_get_pool().submit(call) for call in calls]
+    wait(futures, timeout=Config.QUALIFY_TIMEOUT)
+    # Cancel everything still queued before blocking on the running ones
+    dropped = [future.cancel() for future in futures]
+    outcomes: List[Union[Any, BaseException]] = []
+    for future, cancelled in zip(futures, dropped):
+        if cancelled:
+            outcomes.append(TimeoutError(f"qualification did not start within {Config.QUALIFY_TIMEOUT}s"))
+            continue
+        try:
+            outcomes.append(future.result())
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
+
+def qualify_batch(requests: List[QualifyRequest]) -> List[Union[Verdict, BaseException]]:
+    """Qualifies leads with one request per sender product.
+
+    Companies missing from the batched answer (or all of them, when the call
+    fails or doesn't parse) are asked again one at a time, so a bad batch
+    costs extra calls but never a wrong or lost verdict. A lead whose own
+    call fails gets its exception back in its slot; the others are unaffected.
+    """
+    by_product: Dict[str, List[int]] = {}
+    for i, request in enumerate(requests):
+        by_product.setdefault(request["product"], []).append(i)
+    groups = [indices for indices in by_product.values() if len(indices) > 1]
+
+    verdicts: Dict[int, Union[Verdict, BaseException]] = {}
+    batched = _run_all([
+        lambda indices=indices: _ask_batch(requests[indices[0]]["product"], [requests[i] for i in indices])
+        for indices in groups
+    ])
+    for indices, answered in zip(groups, batched):
+        if isinstance(answered, BaseException):
+            print(f"⚠️ Batched qualification failed, falling back per lead: {answered!r}")
+            continue
+        verdicts.update({indices[j]: v for j, v in answered.items()})
+
+    missing = [i for i in range(len(requests)) if i not in verdicts]
+    fallbacks = sum(1 for indices in groups for i in indices if i not in verdicts)
+    if fallbacks:
+        metrics.inc("agent_qualify_fallbacks_total", fallbacks)
+    singles = _run_all([lambda i=i: qualify_one(requests[i]) for i in missing])
+    verdicts.update(zip(missing, singles))
+    return [verdicts[i] for i in range(len(requests))]
+
+@resource("qualify_batcher", warm=lambda: Config.BATCH_QUALIFICATION)
+def get_qualify_batcher() -> MicroBatcher[QualifyRequest, Verdict]:
+    """Packs concurrent leads' qualification into one Groq request."""
+    return MicroBatcher(
+        qualify_batch,
+        max_batch=Config.QUALIFY_BATCH_SIZE,
+        max_wait=Config.QUALIFY_BATCH_WAIT,
+        name="qualify",
+        workers=Config.QUALIFY_BATCH_WORKERS,
+    )
@@ -1,34 +1,131 @@
-from functools import lru_cache
-from typing import List, Callable, Any
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings.sentence_transformer import SentenceTransformerEmbeddings
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Callable, Any, Optional
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_groq import ChatGroq
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from .case_index import CaseStudyIndex
 from .config import Config
+from .llm import get_llm
+from .microbatch import MicroBatcher
+from .resources import resource
 
-@lru_cache(maxsize=1)
-def get_vectorstore() -> Chroma:
-    embedding_function = SentenceTransformerEmbeddings(model_name=Config.EMBEDDING_MODEL)
-    return Chroma(persist_directory=Config.CHROMA_PATH, embedding_function=embedding_function)
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import Chroma
+    from langchain_community.embeddings.sentence_transformer import SentenceTransformerEmbeddings
 
+# Chroma and SentenceTransformers are imported on first use (or by warm_up),
+# never at import time; loading them is most of the startup cost.
+
+# Offline stand-ins (benchmarks); None means the real model / Chroma store
+_embeddings_override: Optional[Embeddings] = None
+_case_index_override: Optional[CaseStudyIndex] = None
+
+def set_embeddings(embeddings: Optional[Embeddings]) -> None:
+    global _embeddings_override
+    _embeddings_override = embeddings
+    get_vectorstore.cache_clear()
+    get_embedding_batcher.cache_clear()
+
+def set_case_index(index: Optional[CaseStudyIndex]) -> None:
+    """Serves RETRIEVAL_ENGINE=numpy searches from `index` instead of Chroma."""
+    global _case_index_override
+    _case_index_override = index
+
+def get_embeddings() -> Embeddings:
+    if _embeddings_override is not None:
+        return _embeddings_override
+    return _load_embeddings()
+
+# The throwaway embedding pays the model's first-call setup during warm-up
+@resource("embeddings", prime=lambda model: model.embed_query("warm up"))
+def _load_embeddings() -> "SentenceTransformerEmbeddings":
+    from langchain_community.embeddings.sentence_transformer import SentenceTransformerEmbeddings
+    return SentenceTransformerEmbeddings(model_name=Config.EMBEDDING_MODEL)
+
+@resource("vectorstore")
+def get_vectorstore() -> "Chroma":
+    from langchain_community.vectorstores import Chroma
+    return Chroma(persist_directory=Config.CHROMA_PATH, embedding_function=get_embeddings())
+
+@resource("case_index", warm=lambda: Config.RETRIEVAL_ENGINE == "numpy")
+def get_case_index() -> CaseStudyIndex:
+    """In-memory copy of every case study in Chroma, loaded once per process."""
+    return CaseStudyIndex.from_vectorstore(get_vectorstore())
+
+@resource("embedding_batcher")
+def get_embedding_batcher() -> MicroBatcher[str, List[float]]:
+    """Embeds texts from concurrent leads in one SentenceTransformer call."""
+    return MicroBatcher(
+        get_embeddings().embed_documents,
+        max_batch=Config.EMBED_BATCH_SIZE,
+        max_wait=Config.EMBED_BATCH_WAIT,
+        name="embed",
+    )
+
+def search_by_vector(vector: List[float], k: int = 1) -> List[Document]:
+    if Config.RETRIEVAL_ENGINE == "numpy":
+        return (_case_index_override or get_case_index()).search([vector], k)[0]
+    return get_vectorstore().similarity_search_by_vector(vector, k=k)
+
+class _VectorMemo:
+    """Small thread-safe LRU of query vectors."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._items.get(key)
+            if vector is not None:
+                self._items.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._items[key] = vector
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+@resource("hyde_retriever")
 def get_hyde_retriever() -> Callable[[str, str], List[Document]]:
-    """Returns a function that performs Hypothetical Document Search."""
-    
-    llm_hyde = ChatGroq(model=Config.RAG_LLM_MODEL, temperature=0)
-    db = get_vectorstore()
-    
+    """Returns a function that performs Hypothetical Document Search.
+
+    Built once per process. The query vector is memoized by company plus a
+    hash of the research summary, so the critic-triggered rewrite of a lead
+    (and other contacts at the same company) skip both the HyDE generation
+    and the embedding. With HYDE_MODE=summary the research summary is
+    embedded directly and no LLM call is made at all.
+    """
+
+    llm_hyde = get_llm(0.0, Config.RAG_LLM_MODEL)
+
     hyde_prompt = ChatPromptTemplate.from_template(
         "Generate a hypothetical success story about a company similar to {company} "
         "solving challenges using AI. Use industry-specific terms. Context: {query}"
     )
+    chain = hyde_prompt | llm_hyde
+    memo = _VectorMemo(Config.HYDE_MEMO_SIZE)
 
-    def search(company: str, query: str) -> List[Document]:
-        chain = hyde_prompt | llm_hyde
+    def query_text(company: str, query: str) -> str:
+        if Config.HYDE_MODE == "summary":
+            return f"{company}. {query}"
         hypo_doc: Any = chain.invoke({"company": company, "query": query})
-        
+
         # Ensure content is extracted cleanly as a string
-        content = getattr(hypo_doc, "content", "")
-        return db.similarity_search(str(content), k=1)
-    
-    return search
\ No newline at end of file
+        return str(getattr(hypo_doc, "content", ""))
+
+    def search(company: str, query: str) -> List[Document]:
+        digest = hashlib.sha256(query.encode("utf-8")).hexdigest()[:16]
+        key = f"{Config.HYDE_MODE}:{' '.join(company.casefold().split())}:{digest}"
+        vector = memo.get(key)
+        if vector is None:
+            vector = get_embedding_batcher()(query_text(company, query))
+            memo.put(key, vector)
+        return search_by_vector(vector, k=1)
+
+    return search
@@ -0,0 +1,214 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from .config import Config
+from .metrics import external_call, metrics
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+POLL_INTERVAL = 0.05  # seconds between checks for a free concurrency slot
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token) used for TPM budgeting."""
+    return max(1, len(text) // 4)
+
+# --- PRIMITIVES ---
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`.
+
+    `reserve` debits immediately (the balance may go negative) and returns
+    how long the caller must wait, so sync and async callers share one bucket.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+class AdaptiveLimit:
+    """AIMD concurrency limit.
+
+    Grows by one slot after `limit` successes (additive increase) and halves
+    on throttling (multiplicative decrease). Other errors, such as 5xx or
+    timeouts, are neutral: they neither count as successes nor shrink it.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1) -> None:
+        self.limit = initial
+        self.maximum = maximum
+        self.minimum = minimum
+        self.in_flight = 0
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, throttled: bool = False, failed: bool = False) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit // 2)
+                self._successes = 0
+                return
+            if failed:
+                return
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+
+# --- ERROR CLASSIFICATION ---
+_STATUS_IN_MESSAGE = re.compile(r"\b(?:error|status)[\s:=]*(\d{3})\b", re.IGNORECASE)
+
+def status_of(error: Exception) -> Optional[int]:
+    """Best-effort HTTP status for SDK errors (groq, requests, httpx, aiohttp)."""
+    for candidate in (error, getattr(error, "response", None)):
+        status = getattr(candidate, "status_code", None) or getattr(candidate, "status", None)
+        if isinstance(status, int):
+            return status
+    match = _STATUS_IN_MESSAGE.search(str(error))
+    return int(match.group(1)) if match else None
+
+def _is_retryable(error: Exception) -> bool:
+    if status_of(error) in RETRYABLE_STATUS:
+        return True
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name
+
+def _retry_after(error: Exception) -> float:
+    headers: Any = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+# --- SCHEDULER ---
+class ProviderScheduler:
+    """Coordinates every call to one provider/model.
+
+    Each call waits for a request token, for its estimated prompt tokens in
+    the TPM bucket (when one is configured) and for an AIMD concurrency slot.
+    Throttling and server errors are retried with full-jitter backoff,
+    honouring Retry-After when the provider sends it.
+    """
+
+    def __init__(
+        self, name: str, rpm: float, tpm: Optional[float],
+        initial_concurrency: int, max_concurrency: int, max_retries: int
+    ) -> None:
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveLimit(initial_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.retries = 0
+        self.throttled = 0
+
+    def _admission_delay(self, tokens: int) -> float:
+        delay = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        return delay
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        jittered = random.uniform(0, min(Config.RETRY_MAX_DELAY, Config.RETRY_BASE_DELAY * 2 ** attempt))
+        return max(jittered, _retry_after(error))
+
+    def _on_error(self, error: Exception, attempt: int) -> bool:
+        """Releases the slot and returns True if the call should be retried."""
+        throttled = status_of(error) == 429
+        self.concurrency.release(throttled=throttled, failed=True)
+        if throttled:
+            self.throttled += 1
+            metrics.inc("agent_throttled_total", provider=self.name)
+        if attempt >= self.max_retries or not _is_retryable(error):
+            return False
+        self.retries += 1
+        metrics.inc("agent_retries_total", provider=self.name)
+        return True
+
+    def call(self, fn: Callable[[], T], tokens: int = 0) -> T:
+        attempt = 0
+        while True:
+            queued = time.perf_counter()
+            time.sleep(self._admission_delay(tokens))
+            while not self.concurrency.try_acquire():
+                time.sleep(POLL_INTERVAL)
+            metrics.observe("agent_scheduler_wait_seconds", time.perf_counter() - queued, provider=self.name)
+            try:
+                with external_call(self.name, "call"):
+                    result = fn()
+            except Exception as e:
+                if not self._on_error(e, attempt):
+                    raise
+                time.sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+            self.concurrency.release()
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        attempt = 0
+        while True:
+            queued = time.perf_counter()
+            await asyncio.sleep(self._admission_delay(tokens))
+            while not self.concurrency.try_acquire():
+                await asyncio.sleep(POLL_INTERVAL)
+            metrics.observe("agent_scheduler_wait_seconds", time.perf_counter() - queued, provider=self.name)
+            try:
+                with external_call(self.name, "call"):
+                    result = await fn()
+            except Exception as e:
+                if not self._on_error(e, attempt):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+            self.concurrency.release()
+            return result
+
+_schedulers: Dict[str, ProviderScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(provider: str, model: str = "") -> ProviderScheduler:
+    """One shared scheduler per provider (and per model for Groq, whose limits are per model)."""
+    key = f"{provider}:{model}" if model else provider
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            if provider == "groq":
+                scheduler = ProviderScheduler(
+                    key, Config.GROQ_RPM, Config.GROQ_TPM,
+                    Config.GROQ_CONCURRENCY, Config.GROQ_MAX_CONCURRENCY, Config.MAX_RETRIES
+                )
+            elif provider == "tavily":
+                scheduler = ProviderScheduler(
+                    key, Config.TAVILY_RPM, None,
+                    Config.TAVILY_CONCURRENCY, Config.TAVILY_MAX_CONCURRENCY, Config.MAX_RETRIES
+                )
+            else:
+                raise ValueError(f"Unknown provider: {provider}")
+            _schedulers[key] = scheduler
+        return scheduler
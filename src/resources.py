@@ -0,0 +1,136 @@
+import functools
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, List, Optional, TypedDict, TypeVar, Union
+
+T = TypeVar("T")
+
+# Modules that declare warmable resources; imported by warm_up so their
+# resources are registered. Order matters: models before the stores using them.
+WARM_MODULES = ("src.cache", "src.fetch", "src.tools", "src.llm", "src.rag", "src.graph")
+
+class ResourceStatus(TypedDict):
+    name: str
+    ready: bool
+    seconds: Optional[float]
+    error: Optional[str]
+
+class Resource(Generic[T]):
+    """A lazily built, process-wide singleton, in the spirit of st.cache_resource.
+
+    The first caller builds it; concurrent callers wait for that same build
+    instead of starting their own. Module state survives Streamlit reruns,
+    so each resource is built once per server process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        builder: Callable[[], T],
+        warm: Union[bool, Callable[[], bool]] = True,
+        prime: Optional[Callable[[T], Any]] = None,
+    ) -> None:
+        self.name = name
+        self.warm = warm
+        self.prime = prime
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._builder = builder
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._ready = False
+        functools.update_wrapper(self, builder)
+
+    def __call__(self) -> T:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    start = time.perf_counter()
+                    self._value = self._builder()
+                    self.seconds = time.perf_counter() - start
+                    self._ready = True
+        return self._value  # type: ignore[return-value]
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._value = None
+            self._ready = False
+            self.seconds = None
+
+    def should_warm(self) -> bool:
+        return self.warm() if callable(self.warm) else self.warm
+
+_registry: Dict[str, "Resource[Any]"] = {}
+
+def resource(
+    name: str,
+    warm: Union[bool, Callable[[], bool]] = True,
+    prime: Optional[Callable[[Any], Any]] = None,
+) -> Callable[[Callable[[], T]], "Resource[T]"]:
+    """Registers a zero-argument builder as a shared resource.
+
+    `warm` decides whether warm_up builds it ahead of time; `prime` runs once
+    after a warm-up build (e.g. a throwaway embedding, so the model's first
+    real call is not slower than the rest).
+    """
+
+    def decorate(builder: Callable[[], T]) -> "Resource[T]":
+        entry = Resource(name, builder, warm, prime)
+        _registry[name] = entry
+        return entry
+
+    return decorate
+
+def statuses() -> List[ResourceStatus]:
+    return [
+        {"name": r.name, "ready": r.ready, "seconds": r.seconds, "error": r.error}
+        for r in _registry.values()
+    ]
+
+# --- WARM-UP ---
+_warm_thread: Optional[threading.Thread] = None
+_warm_lock = threading.Lock()
+
+def _warm_all(verbose: bool) -> None:
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+    for entry in list(_registry.values()):
+        if entry.ready or not entry.should_warm():
+            continue
+        try:
+            value = entry()
+            if entry.prime is not None:
+                start = time.perf_counter()
+                entry.prime(value)
+                entry.seconds = (entry.seconds or 0.0) + time.perf_counter() - start
+            entry.error = None
+        except Exception as e:
+            # Not fatal: the first real use builds it again and surfaces the error
+            entry.error = f"{type(e).__name__}: {e}"
+            if verbose:
+                print(f"⚠️ Warm-up of {entry.name} failed: {entry.error}")
+
+def warm_up(background: bool = True, verbose: bool = False) -> Optional[threading.Thread]:
+    """Imports the heavy modules and builds every warmable resource.
+
+    In the background (the default) this overlaps model loading with CSV
+    parsing or the UI coming up; callers that need a resource before it is
+    ready simply wait on its build. Only the first call starts a thread.
+    """
+    global _warm_thread
+    if not background:
+        _warm_all(verbose)
+        return None
+    with _warm_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=_warm_all, args=(verbose,), name="warm-up", daemon=True)
+            _warm_thread.start()
+        return _warm_thread
+
+def warm_up_done() -> bool:
+    return _warm_thread is not None and not _warm_thread.is_alive()
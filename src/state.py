@@ -20,6 +20,7 @@ class AgentState(TypedDict):
     qualification_reason: str
     
     # Email Drafting Data
+    case_study: Optional[str]
     draft_email: str
     critique_feedback: Optional[str]
     is_perfect: bool
@@ -0,0 +1,228 @@
+import csv
+import json
+import os
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .config import Config
+
+# Columns written for every lead, in this order
+RESULT_FIELDS = ["index", "lead_name", "company", "is_qualified", "qualification_reason", "draft_email", "error"]
+
+CsvSource = Union[str, "os.PathLike[str]", IO[Any]]
+
+# --- INGESTION ---
+def iter_leads(
+    source: CsvSource,
+    name_col: str = "name",
+    company_col: str = "company",
+    chunksize: Optional[int] = None,
+) -> Iterator[Tuple[str, str]]:
+    """Yields (lead_name, company) pairs, reading the CSV `chunksize` rows at a time.
+
+    Only the two mapped columns are parsed, so memory stays flat no matter how
+    large the file is.
+    """
+    chunks = pd.read_csv(
+        source, usecols=[name_col, company_col], dtype=str, keep_default_na=False,
+        chunksize=chunksize or Config.CSV_CHUNK_SIZE,
+    )
+    for chunk in chunks:
+        for name, company in zip(chunk[name_col], chunk[company_col]):
+            yield str(name), str(company)
+
+def count_rows(source: CsvSource, chunksize: Optional[int] = None) -> int:
+    """Counts data rows without loading the file (quoted newlines are handled)."""
+    chunks = pd.read_csv(source, usecols=[0], dtype=str, chunksize=chunksize or Config.CSV_CHUNK_SIZE)
+    return sum(len(chunk) for chunk in chunks)
+
+# --- RESULT SINK ---
+def to_row(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Flattens a LeadResult into one output row."""
+    output: Dict[str, Any] = result.get("output") or {}
+    return {
+        "index": result["index"],
+        "lead_name": result["lead_name"],
+        "company": result["company"],
+        "is_qualified": bool(output.get("is_qualified", False)) and not result.get("error"),
+        "qualification_reason": str(output.get("qualification_reason", "")),
+        "draft_email": str(output.get("draft_email", "")),
+        "error": result.get("error") or "",
+    }
+
+class ResultSink:
+    """Appends each finished lead to JSONL/CSV (and optionally Parquet) on disk.
+
+    Rows are flushed as they are written, so a crash loses at most the lead in
+    flight. Opening an existing sink appends to it, which is what a resumed
+    run wants, and keeps one row per lead index: a lead already written
+    successfully is skipped, and a retried lead replaces its earlier failed
+    row when the sink is closed. Parquet has no append mode: rows are
+    buffered into row groups and each sink instance writes its own
+    `<path>.<n>.parquet` part file (not deduplicated).
+    """
+
+    def __init__(self, path: str, formats: Optional[Sequence[str]] = None) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.formats = list(formats or Config.OUTPUT_FORMATS)
+        self.written = 0
+        self.qualified = 0
+        self.failed = 0
+        self._files: List[IO[str]] = []
+        self._jsonl: Optional[IO[str]] = None
+        self._csv_file: Optional[IO[str]] = None
+        self._csv: Optional["csv.DictWriter[str]"] = None
+        self._parquet: Any = None
+        self._parquet_rows: List[Dict[str, Any]] = []
+        # index -> whether its row on disk succeeded, for rows from earlier attempts too
+        self._seen: Dict[int, bool] = {int(row["index"]): not row["error"] for row in self._existing_rows()}
+        self._superseded = False
+
+        if "jsonl" in self.formats:
+            self._jsonl = self._open(f"{path}.jsonl")
+        if "csv" in self.formats:
+            csv_path = f"{path}.csv"
+            is_new = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+            self._csv_file = self._open(csv_path)
+            self._csv = csv.DictWriter(self._csv_file, fieldnames=RESULT_FIELDS)
+            if is_new:
+                self._csv.writeheader()
+        if "parquet" in self.formats:
+            try:
+                import pyarrow  # type: ignore # noqa: F401
+            except ImportError as e:
+                raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+
+    def _open(self, file_path: str) -> IO[str]:
+        ends_mid_row = False
+        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+            with open(file_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                ends_mid_row = f.read(1) != b"\n"
+        handle = open(file_path, "a", encoding="utf-8", newline="")
+        if ends_mid_row:
+            handle.write("\n")  # Cut off by a crash; keep the next row on its own line
+        self._files.append(handle)
+        return handle
+
+    def _existing_rows(self) -> Iterator[Dict[str, Any]]:
+        jsonl_path, csv_path = f"{self.path}.jsonl", f"{self.path}.csv"
+        if "jsonl" in self.formats and os.path.exists(jsonl_path):
+            yield from _jsonl_rows(jsonl_path)
+        elif "csv" in self.formats and os.path.exists(csv_path):
+            yield from _csv_rows(csv_path)
+
+    @property
+    def csv_path(self) -> str:
+        return f"{self.path}.csv"
+
+    def write(self, result: Dict[str, Any]) -> None:
+        row = to_row(result)
+        index = int(row["index"])
+        previous = self._seen.get(index)
+        if previous:
+            return  # Already written by an attempt that crashed before recording it
+        if previous is not None:
+            self._superseded = True  # A retry of a failed lead; compacted on close
+        self._seen[index] = not row["error"]
+        self.written += 1
+        self.qualified += int(row["is_qualified"])
+        self.failed += int(bool(row["error"]))
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+        if self._csv is not None and self._csv_file is not None:
+            self._csv.writerow(row)
+            self._csv_file.flush()
+        if "parquet" in self.formats:
+            self._parquet_rows.append(row)
+            if len(self._parquet_rows) >= Config.PARQUET_ROW_GROUP:
+                self._flush_parquet()
+
+    def _flush_parquet(self) -> None:
+        if not self._parquet_rows:
+            return
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+
+        table = pa.Table.from_pylist(self._parquet_rows)
+        if self._parquet is None:
+            part = 0
+            while os.path.exists(f"{self.path}.{part}.parquet"):
+                part += 1
+            self._parquet = pq.ParquetWriter(f"{self.path}.{part}.parquet", table.schema)
+        self._parquet.write_table(table)
+        self._parquet_rows = []
+
+    def close(self) -> None:
+        if "parquet" in self.formats:
+            self._flush_parquet()
+            if self._parquet is not None:
+                self._parquet.close()
+        for handle in self._files:
+            handle.close()
+        self._files = []
+        if self._superseded:
+            self._compact()
+            self._superseded = False
+
+    def _compact(self) -> None:
+        """Rewrites JSONL/CSV keeping only the last row for each index."""
+        if self._jsonl is not None:
+            _keep_last(f"{self.path}.jsonl", _jsonl_rows,
+                       lambda out, row: out.write(json.dumps(row, ensure_ascii=False) + "\n"))
+        if self._csv is not None:
+            _keep_last(f"{self.path}.csv", _csv_rows,
+                       lambda out, row: csv.DictWriter(out, fieldnames=RESULT_FIELDS).writerow(row), header=True)
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def remove_results(path: str) -> None:
+    """Deletes the files a ResultSink at `path` writes, and nothing else that shares the prefix."""
+    for file_path in (f"{path}.jsonl", f"{path}.csv"):
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+    part = 0
+    while os.path.isfile(f"{path}.{part}.parquet"):
+        os.remove(f"{path}.{part}.parquet")
+        part += 1
+
+# Complete rows only; a row half-written when the process crashed is skipped
+def _jsonl_rows(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(row, dict) and "index" in row and "error" in row:
+                yield row
+
+def _csv_rows(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("error") is not None and str(row.get("index", "")).isdigit():
+                yield row
+
+def _keep_last(
+    path: str,
+    read: Callable[[str], Iterator[Dict[str, Any]]],
+    write: Callable[[IO[str], Dict[str, Any]], Any],
+    header: bool = False,
+) -> None:
+    """Atomically rewrites `path` with the last row per index, in two streaming passes."""
+    last = {int(row["index"]): n for n, row in enumerate(read(path))}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+        if header:
+            csv.DictWriter(out, fieldnames=RESULT_FIELDS).writeheader()
+        for n, row in enumerate(read(path)):
+            if last[int(row["index"])] == n:
+                write(out, row)
+    os.replace(tmp_path, path)
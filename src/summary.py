@@ -0,0 +1,94 @@
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import numpy as np
+
+from .config import Config
+from .ratelimit import estimate_tokens
+from .rag import get_embeddings
+from .tools import SCRAPE_FAILED
+
+FALLBACK_SUMMARY = "General research."
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def _pieces(text: str, max_chars: int) -> List[str]:
+    """Sentences, with any sentence longer than max_chars cut on word boundaries."""
+    pieces: List[str] = []
+    for sentence in _SENTENCE_END.split(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+def _passages(snippets: Tuple[str, ...], max_chars: int) -> List[str]:
+    """Splits snippets into sentence-aligned passages of at most max_chars."""
+    passages: List[str] = []
+    for snippet in snippets:
+        text = " ".join(snippet.split())
+        if not text or text.startswith(SCRAPE_FAILED):
+            continue
+        current = ""
+        for piece in _pieces(text, max_chars):
+            if current and len(current) + len(piece) + 1 > max_chars:
+                passages.append(current)
+                current = ""
+            current = f"{current} {piece}".strip()
+        if current:
+            passages.append(current)
+    return passages
+
+@lru_cache(maxsize=256)
+def _build(snippets: Tuple[str, ...], company: str, product: str, budget: int) -> str:
+    passages = _passages(snippets, Config.SUMMARY_PASSAGE_CHARS)
+    if not passages:
+        return FALLBACK_SUMMARY
+
+    embeddings = get_embeddings()
+    vectors = np.asarray(embeddings.embed_documents(passages), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(embeddings.embed_query(f"{company} {product}"), dtype=np.float32)
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+
+    kept: List[int] = []
+    used = 0
+    for i in np.argsort(-(vectors @ query)).tolist():
+        # Near-duplicate of something already kept (syndicated news, repeated boilerplate)
+        if kept and float((vectors[kept] @ vectors[i]).max()) >= Config.SUMMARY_DEDUP_THRESHOLD:
+            continue
+        cost = estimate_tokens(passages[i])
+        if used + cost > budget:
+            continue  # A shorter, less relevant passage may still fit
+        kept.append(i)
+        used += cost
+    return "\n".join(passages[i] for i in kept) or FALLBACK_SUMMARY
+
+def build_summary(snippets: List[str], company: str, product: str) -> str:
+    """Builds the compact research context sent to every downstream LLM call.
+
+    Snippets are split into passages, near-duplicates are dropped, and the
+    rest are ranked by embedding similarity to the company and sender product
+    and packed, most relevant first, into SUMMARY_TOKEN_BUDGET tokens.
+    A budget of 0 keeps the old behaviour of joining every snippet.
+    """
+    if Config.SUMMARY_TOKEN_BUDGET <= 0:
+        return "\n".join(snippets) if snippets else FALLBACK_SUMMARY
+    key = (tuple(snippets), company, product, Config.SUMMARY_TOKEN_BUDGET)
+    # lru_cache alone isn't single-flight: the filter and a speculative
+    # case_study_node ask for the same summary at the same time, so the
+    # second caller waits for the first build and then reads it from the cache
+    with _inflight_lock:
+        lock = _inflight.setdefault(key, threading.Lock())
+    with lock:
+        try:
+            return _build(*key)
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+
+_inflight: Dict[Tuple[Tuple[str, ...], str, str, int], threading.Lock] = {}
+_inflight_lock = threading.Lock()
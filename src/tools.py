@@ -1,30 +1,140 @@
+import asyncio
 import os
-import requests  # type: ignore
-from bs4 import BeautifulSoup  # type: ignore
-from langchain_community.tools.tavily_search import TavilySearchResults
+from typing import TYPE_CHECKING, Any, Optional
+from urllib.parse import urlsplit, urlunsplit
 
-# ... rest of your code stays exactly the same ...
+from .cache import get_disk_cache
+from .config import Config
+from .fetch import HostNotFound, afetch_text, fetch_text
+from .ratelimit import get_scheduler
+from .resources import resource
+
+if TYPE_CHECKING:
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
+# Prefix of scrape results that carry no page text; a host whose name doesn't
+# resolve gets the more specific SITE_NOT_FOUND (which also starts with SCRAPE_FAILED)
+SCRAPE_FAILED = "Scraping failed"
+SITE_NOT_FOUND = "Scraping failed, site not found"
+
+class SearchFailed(Exception):
+    """Tavily gave no answer even after the scheduler's retries; retry the lead later."""
+
+# Replaces Tavily everywhere (offline benchmarks); needs .max_results and .api_wrapper
+_search_tool: Optional[Any] = None
+
+def set_search_tool(tool: Optional[Any]) -> None:
+    global _search_tool
+    _search_tool = tool
+
+def get_search_tool() -> "TavilySearchResults":
+    if _search_tool is not None:
+        return _search_tool
+    return _tavily_tool()
+
+@resource("search_tool")
+def _tavily_tool() -> "TavilySearchResults":
+    from langchain_community.tools.tavily_search import TavilySearchResults
 
-def get_search_tool() -> TavilySearchResults:
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
         raise ValueError("CRITICAL: TAVILY_API_KEY is missing from .env file.")
     return TavilySearchResults(api_key=api_key)
 
+# --- CACHE KEYS ---
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+def _cache_enabled() -> bool:
+    return Config.RESEARCH_CACHE_TTL > 0
+
+# --- SEARCH ---
+def search_web(query: str) -> Any:
+    """Runs a Tavily search, served from the research cache when possible."""
+    key = _normalize_query(query)
+    if _cache_enabled():
+        cached = get_disk_cache().get("tavily", key)
+        if cached is not None:
+            return cached
+
+    # Call the API wrapper directly: the tool wrapper turns HTTP errors into
+    # strings, which would hide 429s from the scheduler's retry logic
+    tool = get_search_tool()
+
+    def search() -> Any:
+        return tool.api_wrapper.results(query, tool.max_results)
+
+    try:
+        results: Any = get_scheduler("tavily").call(search)
+    except Exception as e:
+        # Raised, not returned: an outage must not look like "no news about this company"
+        raise SearchFailed(f"Tavily search failed: {e!r}") from e
+    if _cache_enabled() and isinstance(results, list):
+        get_disk_cache().set("tavily", key, results)
+    return results
+
+async def asearch_web(query: str) -> Any:
+    # The research cache is SQLite (and set() may evict); keep it off the event loop
+    key = _normalize_query(query)
+    if _cache_enabled():
+        cached = await asyncio.to_thread(get_disk_cache().get, "tavily", key)
+        if cached is not None:
+            return cached
+
+    tool = get_search_tool()
+
+    async def search() -> Any:
+        return await tool.api_wrapper.results_async(query, tool.max_results)
+
+    try:
+        results: Any = await get_scheduler("tavily").acall(search)
+    except Exception as e:
+        raise SearchFailed(f"Tavily search failed: {e!r}") from e
+    if _cache_enabled() and isinstance(results, list):
+        await asyncio.to_thread(get_disk_cache().set, "tavily", key, results)
+    return results
+
+# --- SCRAPING ---
+def _scrape_failure(url: str, error: Exception) -> str:
+    prefix = SITE_NOT_FOUND if isinstance(error, HostNotFound) else SCRAPE_FAILED
+    return f"{prefix} for {url}: {str(error)}"
+
 def scrape_website(url: str) -> str:
     """Scrapes a website safely and returns clean text."""
+    key = _normalize_url(url)
+    if _cache_enabled():
+        cached = get_disk_cache().get("scrape", key)
+        if cached is not None:
+            return str(cached)
+
     try:
-        # Prevent hanging forever with a 10-second timeout
-        response = requests.get(url, timeout=10)
-        response.raise_for_status() # Check for 404/500 errors
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Strip out code, keep only text
-        for script in soup(["script", "style"]):
-            script.extract()
-            
-        text = " ".join(soup.get_text().split())
-        return text[:2000] # Return max 2000 chars to save tokens
+        # Pooled, streamed fetch: stops once 2000 chars of visible text are read
+        text = fetch_text(url)
     except Exception as e:
-        return f"Scraping failed for {url}: {str(e)}"
\ No newline at end of file
+        return _scrape_failure(url, e)
+
+    if _cache_enabled():
+        get_disk_cache().set("scrape", key, text)
+    return text
+
+async def ascrape_website(url: str) -> str:
+    """Async twin of scrape_website: waits on the socket instead of a thread."""
+    key = _normalize_url(url)
+    if _cache_enabled():
+        cached = await asyncio.to_thread(get_disk_cache().get, "scrape", key)
+        if cached is not None:
+            return str(cached)
+
+    try:
+        text = await afetch_text(url)
+    except Exception as e:
+        return _scrape_failure(url, e)
+
+    if _cache_enabled():
+        await asyncio.to_thread(get_disk_cache().set, "scrape", key, text)
+    return text
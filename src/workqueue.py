@@ -0,0 +1,207 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict
+
+from .config import Config
+
+class Task(TypedDict):
+    queue_id: str
+    index: int
+    payload: Dict[str, Any]
+    attempts: int
+
+def worker_id() -> str:
+    """Lease owner name: unique per worker, readable in the table."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+class WorkQueue:
+    """Durable lead queue in SQLite with leases and visibility timeouts.
+
+    A worker leases tasks for `visibility` seconds and must complete them (or
+    extend the lease) before it expires; an expired lease, e.g. from a worker
+    that crashed, makes the task available to the next worker. A task whose
+    lead failed is retried until it has been attempted `max_attempts` times.
+
+    Results live in the same table, keyed by (queue, index), so writing a
+    result twice is harmless and the first completion wins. Several machines
+    can share one queue file on shared storage; the rollback journal is used
+    instead of WAL because WAL needs shared memory on a single host.
+    """
+
+    def __init__(self, path: str = Config.QUEUE_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queues ("
+            " queue_id TEXT PRIMARY KEY, sender TEXT NOT NULL, source TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " queue_id TEXT NOT NULL, idx INTEGER NOT NULL, payload TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease_owner TEXT, lease_expires REAL NOT NULL DEFAULT 0,"
+            " result TEXT, updated_at REAL NOT NULL, PRIMARY KEY (queue_id, idx))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (queue_id, status, lease_expires)")
+
+    # --- PRODUCER ---
+    def create(self, sender: Dict[str, str], source: str) -> str:
+        queue_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO queues (queue_id, sender, source, created_at) VALUES (?, ?, ?, ?)",
+                (queue_id, json.dumps(sender), source, time.time()),
+            )
+        return queue_id
+
+    def get(self, queue_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sender, source FROM queues WHERE queue_id = ?", (queue_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"queue_id": queue_id, "sender": json.loads(row[0]), "source": row[1]}
+
+    def enqueue(self, queue_id: str, items: Iterable[Tuple[int, Dict[str, Any]]], chunk: int = 1000) -> int:
+        """Adds (index, payload) tasks; re-enqueueing an index is a no-op."""
+        added = 0
+        batch: List[Tuple[str, int, str, float]] = []
+        for index, payload in items:
+            batch.append((queue_id, index, json.dumps(payload), time.time()))
+            if len(batch) >= chunk:
+                added += self._insert(batch)
+                batch = []
+        if batch:
+            added += self._insert(batch)
+        return added
+
+    def _insert(self, rows: List[Tuple[str, int, str, float]]) -> int:
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks (queue_id, idx, payload, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.execute("COMMIT")
+            return self._conn.total_changes - before
+
+    # --- CONSUMER ---
+    def lease(self, queue_id: str, owner: str, limit: int, visibility: float, max_attempts: int) -> List[Task]:
+        """Claims up to `limit` ready tasks: pending ones, or leased ones whose lease expired."""
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two workers never claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # A lead that keeps killing its worker must not be retried forever
+                self._conn.execute(
+                    "UPDATE tasks SET status = 'failed', lease_owner = NULL, updated_at = ?, result = json_object("
+                    " 'index', idx, 'lead_name', json_extract(payload, '$.lead_name'),"
+                    " 'company', json_extract(payload, '$.company'), 'output', json('{}'),"
+                    " 'error', 'worker lease expired ' || attempts || ' times')"
+                    " WHERE queue_id = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, queue_id, now, max_attempts),
+                )
+                rows = self._conn.execute(
+                    "SELECT idx, payload, attempts FROM tasks WHERE queue_id = ?"
+                    " AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+                    " ORDER BY idx LIMIT ?",
+                    (queue_id, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?,"
+                    " attempts = attempts + 1, updated_at = ? WHERE queue_id = ? AND idx = ?",
+                    [(owner, now + visibility, now, queue_id, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            {"queue_id": queue_id, "index": int(idx), "payload": json.loads(payload), "attempts": int(attempts) + 1}
+            for idx, payload, attempts in rows
+        ]
+
+    def extend(self, queue_id: str, owner: str, indices: Iterable[int], visibility: float) -> None:
+        """Heartbeat: pushes back the expiry of leases this owner still holds."""
+        expires = time.time() + visibility
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE tasks SET lease_expires = ? WHERE queue_id = ? AND idx = ?"
+                " AND status = 'leased' AND lease_owner = ?",
+                [(expires, queue_id, index, owner) for index in indices],
+            )
+
+    def release(self, queue_id: str, owner: str, indices: Iterable[int]) -> None:
+        """Hands unfinished leases back at shutdown instead of letting them expire.
+
+        The interrupted attempt doesn't count towards max_attempts.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE tasks SET status = 'pending', lease_owner = NULL, lease_expires = 0,"
+                " attempts = MAX(attempts - 1, 0), updated_at = ?"
+                " WHERE queue_id = ? AND idx = ? AND status = 'leased' AND lease_owner = ?",
+                [(now, queue_id, index, owner) for index in indices],
+            )
+
+    def complete(self, queue_id: str, owner: str, index: int, result: Dict[str, Any], max_attempts: int) -> None:
+        """Stores a lead's result. Failed leads go back to pending until max_attempts is reached.
+
+        A success is kept whoever reports it; a failure only counts from the
+        current lease holder, so a worker that lost its lease can't reset the task.
+        """
+        failed = bool(result.get("error"))
+        now = time.time()
+        with self._lock:
+            if failed:
+                self._conn.execute(
+                    "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+                    " result = ?, lease_owner = NULL, lease_expires = 0, updated_at = ?"
+                    " WHERE queue_id = ? AND idx = ? AND status = 'leased' AND lease_owner = ?",
+                    (max_attempts, json.dumps(result), now, queue_id, index, owner),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE tasks SET status = 'done', result = ?, lease_owner = NULL, lease_expires = 0,"
+                    " updated_at = ? WHERE queue_id = ? AND idx = ? AND status != 'done'",
+                    (json.dumps(result), now, queue_id, index),
+                )
+
+    # --- REPORTING ---
+    def counts(self, queue_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE queue_id = ? GROUP BY status", (queue_id,)
+            ).fetchall()
+        return {str(status): int(count) for status, count in rows}
+
+    def drained(self, queue_id: str) -> bool:
+        """True once every task is done or has used up its attempts."""
+        counts = self.counts(queue_id)
+        return counts.get("pending", 0) == 0 and counts.get("leased", 0) == 0
+
+    def results(self, queue_id: str, chunk: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Final results in input order, read `chunk` rows at a time."""
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT idx, result FROM tasks WHERE queue_id = ? AND idx > ?"
+                    " AND status IN ('done', 'failed') ORDER BY idx LIMIT ?",
+                    (queue_id, last, chunk),
+                ).fetchall()
+            if not rows:
+                return
+            for idx, result in rows:
+                last = int(idx)
+                yield json.loads(result)